@@ -8,17 +8,26 @@ from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 import requests
 import pandas as pd
-import json
 import time
 from datetime import datetime
 import os
-from retrying import retry
+import argparse
 from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor
+from http_cache import HttpCache
+from link_crawler import HttpLinkCrawler, LETTERS
+from politeness import PoliteScheduler
+from record_stream import NdjsonWriter
+from driver_pool import DriverPool, wait_until_ready
+from scraper import extract_breed_data
+from url_frontier import UrlFrontier
+from run_journal import RunJournal, LOADED
 
 
 class AKCScraper:
-    def __init__(self):
-        self.base_url = "https://www.akc.org/dog-breeds/"
+    def __init__(self, base_url="https://www.akc.org/dog-breeds/", cache_dir='.http_cache',
+                 pool_size=2, max_pages=50, rate=2.0):
+        self.base_url = base_url
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -35,19 +44,91 @@ class AKCScraper:
         self.chrome_options.add_argument(
             f'user-agent={self.headers["User-Agent"]}')
 
-        # Setup Chrome service
-        self.service = Service(ChromeDriverManager().install())
+        # Chrome service is only set up when a page actually needs a browser
+        self.service = None
+        self.pool = None
+        self.pool_size = pool_size
+        self.max_pages = max_pages
 
-    def get_breed_links(self):
-        breeds = []
+        self.cache = HttpCache(cache_dir) if cache_dir else None
+        # Paces the HTTP crawl and the browsers alike, starting at `rate` pages/second
+        self.scheduler = PoliteScheduler(rate)
+
+        # Links of the last get_breed_links run, with listing provenance
+        self.frontier = None
+
+        # Per-letter progress of the browser link walk, removed once links are saved
+        self.link_journal_path = os.path.join(self.output_dir, 'breed_links.journal.jsonl')
+
+    def _get_service(self):
+        if self.service is None:
+            self.service = Service(ChromeDriverManager().install())
+        return self.service
+
+    def _get_pool(self):
+        if self.pool is None:
+            # Pooled browsers are headless, the link walk keeps a visible one for debugging
+            options = Options()
+            for argument in self.chrome_options.arguments:
+                options.add_argument(argument)
+            options.add_argument('--headless=new')
+            self.pool = DriverPool(
+                lambda: webdriver.Chrome(service=self._get_service(), options=options),
+                size=self.pool_size, max_pages=self.max_pages)
+        return self.pool
+
+    def close(self):
+        """Quits any pooled browsers"""
+        if self.pool:
+            self.pool.close()
+
+    def get_breed_links(self, use_browser=False):
+        """Collects breed links over plain HTTP, using Chrome only for letters that need JS"""
+        if use_browser:
+            self.frontier = self._get_breed_links_selenium()
+            return self.frontier.links()
+
+        print("Starting to collect breed links over HTTP...")
+        crawler = HttpLinkCrawler(self.base_url, headers=self.headers, cache=self.cache,
+                                  scheduler=self.scheduler)
+        self.frontier, needs_browser = crawler.crawl()
+        if crawler.failed:
+            # A partial link list would look like breeds were dropped from the site
+            raise RuntimeError(f"Couldn't fetch {len(crawler.failed)} listing pages, "
+                               "not saving an incomplete link list")
+
+        if needs_browser:
+            print(f"Falling back to Chrome for letters: {', '.join(needs_browser)}")
+            self._get_breed_links_selenium(needs_browser, self.frontier)
+
+        print(f"\nSuccessfully extracted {len(self.frontier)} breed links")
+        return self.frontier.links()
+
+    def _get_breed_links_selenium(self, letters=LETTERS, frontier=None):
+        """Walks the listing pages in Chrome, adding links to (and returning) a frontier
+
+        Finished letters are journaled, so a walk that dies halfway resumes
+        with the letters it hadn't finished.
+        """
+        if frontier is None:
+            frontier = UrlFrontier()
+        journal = RunJournal(self.link_journal_path)
         driver = webdriver.Chrome(
-            service=self.service, options=self.chrome_options)
+            service=self._get_service(), options=self.chrome_options)
 
         try:
             print("Starting to collect breed links...")
-            alphabet = list('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+            alphabet = list(letters)
 
             for letter in alphabet:
+                record = journal.get(f"letter:{letter}")
+                if record and record['state'] == LOADED:
+                    for link in record['data']['links']:
+                        frontier.add(link['url'], link['name'], letter, link['page'])
+                    print(f"\nLetter {letter} already collected in a previous run")
+                    continue
+
+                letter_failed = False
                 letter_url = f"{self.base_url}?letter={letter}"
                 print(f"\nProcessing letter {letter} at URL: {letter_url}")
 
@@ -61,15 +142,18 @@ class AKCScraper:
                     current_url = f"{self.base_url}page/{page}/?letter={letter}" if page > 1 else letter_url
                     print(f"Processing page {page} at {current_url}")
 
-                    driver.get(current_url)
-
                     # Wait for the breed cards to load
                     try:
+                        self.scheduler.wait(current_url)
+                        start = time.perf_counter()
+                        driver.get(current_url)
+
                         # First wait for the grid container
                         WebDriverWait(driver, 10).until(
                             EC.presence_of_element_located(
                                 (By.CLASS_NAME, "breed-card-type-grid"))
                         )
+                        self.scheduler.record(current_url, 200, time.perf_counter() - start)
 
                         # Then get all breed cards
                         breed_cards = driver.find_elements(
@@ -82,11 +166,13 @@ class AKCScraper:
                             if retry_count <= max_retries:
                                 print(
                                     f"No breeds found, retrying... (Attempt {retry_count}/{max_retries})")
-                                time.sleep(3)  # Wait a bit longer before retry
+                                # Back off before the retry
+                                self.scheduler.failed(current_url)
                                 continue
                             else:
                                 print(
                                     f"Failed to find breeds for letter {letter} after {max_retries} attempts")
+                                letter_failed = True
                                 break
 
                         print(f"Found {num_breeds} breeds on page {page}")
@@ -100,8 +186,7 @@ class AKCScraper:
                                     'url': link.get_attribute('href')
                                 }
                                 # Avoid duplicates
-                                if breed_info['url'] not in [b['url'] for b in breeds]:
-                                    breeds.append(breed_info)
+                                if frontier.add(breed_info['url'], breed_info['name'], letter, page):
                                     print(f"Added breed: {breed_info['name']}")
                             except Exception as e:
                                 print(f"Error processing card: {str(e)}")
@@ -121,51 +206,114 @@ class AKCScraper:
                         if retry_count <= max_retries:
                             print(
                                 f"Retrying... (Attempt {retry_count}/{max_retries})")
-                            time.sleep(3)
+                            self.scheduler.failed(current_url)
                             continue
                         else:
                             print(
                                 f"Failed after {max_retries} attempts, moving to next letter")
+                            letter_failed = True
                             break
 
-                    time.sleep(2)  # Be nice to the server
+                if letter_failed:
+                    journal.fail(f"letter:{letter}", f"gave up on page {page}")
+                else:
+                    journal.mark(f"letter:{letter}", LOADED, links=[
+                        {'name': entry['name'], 'url': entry['url'], 'page': entry['page']}
+                        for entry in frontier if entry['letter'] == letter])
 
         except Exception as e:
             print(f"Error in get_breed_links: {str(e)}")
 
         finally:
             driver.quit()
+            journal.close()
 
-        print(f"\nSuccessfully extracted {len(breeds)} breed links")
-        return breeds
+        print(f"\nSuccessfully extracted {len(frontier)} breed links")
+        return frontier
 
     def save_data(self, data):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-        # Save as JSON
-        json_path = os.path.join(
-            self.output_dir, f'dog_breeds_{timestamp}.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        print(f"URLs saved to {json_path}")
+        # Save as NDJSON, one link per line, moved into place once complete
+        links_path = os.path.join(
+            self.output_dir, f'dog_breeds_{timestamp}.ndjson')
+        with NdjsonWriter(links_path) as writer:
+            for link in data:
+                writer.write(link)
+        print(f"URLs saved to {links_path}")
+
+        # Save the frontier next to it, reporting what changed since the last run
+        if self.frontier is not None:
+            previous = UrlFrontier.latest(self.output_dir)
+            if previous is not None:
+                added, removed = self.frontier.diff(previous)
+                print(f"{len(added)} new and {len(removed)} removed breeds since the last run")
+                for entry in added:
+                    print(f"New breed: {entry['name']} ({entry['url']})")
+
+            frontier_path = os.path.join(self.output_dir, f'frontier_{timestamp}.json')
+            self.frontier.save(frontier_path)
+            print(f"Frontier saved to {frontier_path}")
+
+        # The link walk is complete, the next one starts from scratch
+        if os.path.exists(self.link_journal_path):
+            os.remove(self.link_journal_path)
+
+    def get_breed_details(self, url):
+        """Loads a breed page in a pooled browser, when the scheduler allows, and extracts its breed data"""
+        try:
+            with self._get_pool().driver() as driver:
+                self.scheduler.wait(url)
+                start = time.perf_counter()
+                driver.get(url)
+                wait_until_ready(
+                    driver, (By.CSS_SELECTOR, '[data-js-component="breedPage"]'))
+                self.scheduler.record(url, 200, time.perf_counter() - start)
+                return extract_breed_data(driver.page_source)
+        except Exception as e:
+            print(f"Error getting details for {url}: {e}")
+            self.scheduler.failed(url)
+            return None
+
+    def scrape_all_breeds(self, path=None):
+        """Scrapes every breed page, streaming the details to an NDJSON file as they arrive.
 
-    def scrape_all_breeds(self):
+        Nothing is kept in memory; if the run dies, the details scraped so
+        far are in path + '.part'. Returns the path written.
+        """
+        if path is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(self.output_dir, f'breed_details_{timestamp}.ndjson.gz')
         breeds = self.get_breed_links()
-        all_breeds_data = []
 
-        for breed in tqdm(breeds, desc="Scraping breeds"):
-            details = self.get_breed_details(breed['url'])
-            if details:
-                all_breeds_data.append(details)
-            time.sleep(2)
+        # One worker per pooled browser
+        try:
+            with NdjsonWriter(path) as writer, \
+                    ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+                results = executor.map(self.get_breed_details,
+                                       [breed['url'] for breed in breeds])
+                for details in tqdm(results, total=len(breeds), desc="Scraping breeds"):
+                    if details:
+                        writer.write(details)
+        finally:
+            self.close()
 
-        return all_breeds_data
+        print(f"{writer.count} breeds saved to {path}")
+        return path
 
 
 def main():
-    scraper = AKCScraper()
+    parser = argparse.ArgumentParser(description="Collect AKC breed page URLs")
+    parser.add_argument('--browser', action='store_true',
+                        help="collect links with Chrome instead of plain HTTP")
+    parser.add_argument('--base-url', default="https://www.akc.org/dog-breeds/")
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    scraper = AKCScraper(base_url=args.base_url,
+                         cache_dir=None if args.no_cache else '.http_cache')
     print("Starting AKC breed URL collection...")
-    breed_links = scraper.get_breed_links()
+    breed_links = scraper.get_breed_links(use_browser=args.browser)
     scraper.save_data(breed_links)
     print("URL collection complete!")
 
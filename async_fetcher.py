@@ -0,0 +1,116 @@
+import asyncio
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from politeness import PoliteScheduler
+
+
+class AsyncFetcher:
+    """Fetches and parses pages concurrently.
+
+    Requests go through one keep-alive requests.Session shared by a bounded
+    pool of workers and are paced per host by a PoliteScheduler (by default
+    one starting at `rate` requests/second with bursts of `burst`), which
+    also retries throttled requests. Both the blocking HTTP call and the
+    parse callback run in a thread pool so the event loop only schedules
+    work. An optional HttpCache turns repeat fetches into conditional GETs.
+    With a RunMetrics, fetches, pacing waits and parses are timed per key
+    and responses and failures counted.
+    """
+
+    def __init__(self, parse, workers=8, rate=2.0, burst=4, headers=None, timeout=30,
+                 cache=None, on_result=None, metrics=None, scheduler=None):
+        self.parse = parse
+        self.cache = cache
+        self.metrics = metrics
+        # Called on the event loop as on_result(key, result, error) as each item finishes
+        self.on_result = on_result
+        self.workers = max(1, int(workers))
+        self.scheduler = scheduler or PoliteScheduler(rate, burst)
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+        self.scheduler.watch(self.session)
+        if metrics:
+            metrics.watch(self.session)
+
+        # key -> error message for items whose fetch or parse failed
+        self.errors = {}
+        # key -> HTTP status of items whose fetch got an error response
+        self.error_statuses = {}
+
+    def _stage(self, name, key):
+        return self.metrics.stage(name, key) if self.metrics else nullcontext()
+
+    def _get(self, url):
+        if self.cache:
+            return self.cache.get(self.session, url, timeout=self.timeout)
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    async def _worker(self, queue, results, executor):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            try:
+                index, key, url = item
+                stage = 'fetch'
+                try:
+                    # Times the request as 'fetch' and the wait for a slot as 'pacing_wait'
+                    html_content = await self.scheduler.fetch_async(
+                        self._get, url, executor, self.metrics, key)
+                    stage = 'parse'
+                    with self._stage(stage, key):
+                        results[index] = await loop.run_in_executor(
+                            executor, self.parse, key, html_content)
+                except Exception as e:
+                    print(f"Error fetching {url}: {e}")
+                    self.errors[key] = str(e)
+                    if isinstance(e, requests.HTTPError) and e.response is not None:
+                        self.error_statuses[key] = e.response.status_code
+                    results[index] = None
+                    if self.metrics:
+                        self.metrics.count(f"{stage}_failures")
+                if self.on_result:
+                    self.on_result(key, results[index], self.errors.get(key))
+            finally:
+                queue.task_done()
+
+    async def fetch_all(self, items):
+        """Fetches (key, url) pairs and returns parse(key, html) results in input order.
+
+        Failed fetches yield None in their slot, with the error in self.errors[key].
+        """
+        items = list(items)
+        results = [None] * len(items)
+        queue = asyncio.Queue()
+        for index, (key, url) in enumerate(items):
+            queue.put_nowait((index, key, url))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            tasks = [asyncio.create_task(self._worker(queue, results, executor))
+                     for _ in range(min(self.workers, len(items)) or 1)]
+            try:
+                await queue.join()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        return results
+
+    def run(self, items):
+        """Synchronous entry point for fetch_all"""
+        try:
+            return asyncio.run(self.fetch_all(items))
+        finally:
+            self.session.close()
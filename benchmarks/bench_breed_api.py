@@ -0,0 +1,145 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from breed_api import ResponseCache, start_api_server  # noqa: E402
+from breed_fields import TRAIT_COLUMNS  # noqa: E402
+from breed_loader import BulkBreedLoader  # noqa: E402
+from breed_parser import extract_breed_info  # noqa: E402
+from db import Database  # noqa: E402
+from record_stream import read_records  # noqa: E402
+from snapshot_diff import snapshot_paths  # noqa: E402
+from url_frontier import UrlFrontier  # noqa: E402
+
+
+FIXTURE_BREED = 'affenpinscher'
+
+
+def seed_if_empty(db):
+    """Loads every breed of the saved link list, built from the fixture page, into an empty table"""
+    with db.transaction() as cur:
+        cur.execute("SELECT count(*) FROM dog_breeds")
+        if cur.fetchone()[0]:
+            return 0
+
+    frontier = UrlFrontier.from_links(
+        read_records(snapshot_paths(os.path.join(ROOT, 'output'))[-1]))
+    with open(os.path.join(ROOT, 'page_source.html'), 'r', encoding='utf-8') as f:
+        page = f.read()
+
+    loader = BulkBreedLoader(db, batch_size=0)
+    for breed in frontier:
+        breed_info = extract_breed_info(breed['slug'], page.replace(FIXTURE_BREED, breed['slug']))
+        loader.add(dict(breed_info, name=breed['name'], slug=breed['slug']))
+    loader.close()
+    return loader.inserted
+
+
+def request_mix(db, seed=0):
+    """A function returning random API paths: mostly single breeds, then listings and filters"""
+    with db.transaction() as cur:
+        cur.execute("SELECT slug FROM dog_breeds")
+        slugs = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT DISTINCT breed_group FROM dog_breeds WHERE breed_group IS NOT NULL")
+        groups = [row[0] for row in cur.fetchall()]
+    rng = random.Random(seed)
+
+    def next_path():
+        roll = rng.random()
+        if roll < 0.6:
+            return f"/breeds/{rng.choice(slugs)}"
+        if roll < 0.8:
+            return f"/breeds?group={rng.choice(groups)}&offset={rng.choice([0, 20])}"
+        if roll < 0.95:
+            low = rng.randint(1, 4)
+            return f"/breeds?{rng.choice(TRAIT_COLUMNS)}={low}-{low + 1}"
+        return "/groups"
+    return next_path
+
+
+def load_test(base_url, next_path, seconds, concurrency, revalidate):
+    """Hammers base_url from `concurrency` threads, returning latencies and status counts"""
+    deadline = time.perf_counter() + seconds
+    lock = threading.Lock()
+    latencies = []
+    statuses = {}
+
+    def client():
+        session = requests.Session()
+        etags = {}
+        local = []
+        local_statuses = {}
+        while time.perf_counter() < deadline:
+            with lock:
+                path = next_path()
+            headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+            start = time.perf_counter()
+            response = session.get(base_url + path, headers=headers)
+            local.append(time.perf_counter() - start)
+            local_statuses[response.status_code] = local_statuses.get(response.status_code, 0) + 1
+            if 'ETag' in response.headers:
+                etags[path] = response.headers['ETag']
+        with lock:
+            latencies.extend(local)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return time.perf_counter() - start, sorted(latencies), statuses
+
+
+def report(label, elapsed, latencies, statuses):
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+    print(f"{label:<22} {len(latencies) / elapsed:>8,.0f} req/sec  "
+          f"p50 {percentile(0.5):6.2f} ms  p99 {percentile(0.99):6.2f} ms  "
+          f"statuses {dict(sorted(statuses.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the breed API")
+    parser.add_argument('--url', help="an already running API, e.g. http://127.0.0.1:8080; "
+                        "by default servers with and without the cache are started here")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--pool-size', type=int, default=4)
+    args = parser.parse_args()
+
+    db = Database(maxconn=args.pool_size)
+    try:
+        seeded = seed_if_empty(db)
+        if seeded:
+            print(f"Seeded dog_breeds with {seeded} breeds")
+        next_path = request_mix(db)
+
+        if args.url:
+            report(args.url, *load_test(args.url, next_path, args.seconds,
+                                        args.concurrency, False))
+            return
+
+        for label, cache, revalidate in [('no cache', ResponseCache(0), False),
+                                         ('cache', ResponseCache(), False),
+                                         ('cache + If-None-Match', ResponseCache(), True)]:
+            _, port = start_api_server(db, cache)
+            base_url = f"http://127.0.0.1:{port}"
+            report(label, *load_test(base_url, next_path, args.seconds,
+                                     args.concurrency, revalidate))
+        print(db.summary())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from breed_props import extract_breed_props  # noqa: E402
+
+
+FIXTURES = ['example.html', 'page_source.html']
+
+
+def soup_extract(html_content):
+    """The original BeautifulSoup-based extraction, kept as the baseline"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    breed_div = soup.find('div', {'data-js-component': 'breedPage'})
+    if not breed_div:
+        return None
+    return json.loads(breed_div['data-js-props'])
+
+
+def bench(func, html_content, number):
+    """Returns the best per-call time in seconds over a few repeats"""
+    return min(timeit.repeat(lambda: func(html_content), number=number, repeat=3)) / number
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'fixture':<20}{'size':>10}{'soup ms':>12}{'fast ms':>12}{'speedup':>10}")
+
+    for name in FIXTURES:
+        with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+            html_content = f.read()
+
+        if soup_extract(html_content) != extract_breed_props(html_content):
+            print(f"{name}: fast extractor output differs from BeautifulSoup!")
+            continue
+
+        soup_time = bench(soup_extract, html_content, 3)
+        fast_time = bench(extract_breed_props, html_content, 50)
+        print(f"{name:<20}{len(html_content):>10}{soup_time * 1000:>12.2f}"
+              f"{fast_time * 1000:>12.2f}{soup_time / fast_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
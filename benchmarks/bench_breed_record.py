@@ -0,0 +1,90 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from breed_fields import breed_to_row  # noqa: E402
+from breed_props import extract_breed_props  # noqa: E402
+from breed_record import BreedRecord  # noqa: E402
+
+
+FIXTURE_BREED = 'affenpinscher'
+
+
+def sample_breed_data(count, fixture):
+    """`count` (slug, breed_data) pairs, each with its own copy of the fixture's strings"""
+    with open(os.path.join(ROOT, fixture), 'r', encoding='utf-8') as f:
+        breed_data = extract_breed_props(f.read())['settings']['breed_data']
+    sections = {name: {FIXTURE_BREED: section[FIXTURE_BREED]}
+                for name, section in breed_data.items()
+                if isinstance(section, dict) and FIXTURE_BREED in section}
+    template = json.dumps(sections)
+
+    samples = []
+    for i in range(count):
+        slug = f"synthetic-breed-{i:05d}"
+        samples.append((slug, json.loads(template.replace(FIXTURE_BREED, slug))))
+    return samples
+
+
+def measure(build):
+    """Returns (result, bytes allocated and still held by it)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def timed(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare breed_info dicts with BreedRecords")
+    parser.add_argument('--breeds', type=int, default=290)
+    parser.add_argument('--fixture', default='page_source.html')
+    args = parser.parse_args()
+
+    samples = sample_breed_data(args.breeds, args.fixture)
+
+    # Raw HTML fragments are shared with the parsed page, so only the record itself counts
+    lazy, lazy_bytes = measure(
+        lambda: [BreedRecord.from_breed_data(slug, data) for slug, data in samples])
+    dicts, dict_bytes = measure(
+        lambda: [BreedRecord.from_breed_data(slug, data).to_dict() for slug, data in samples])
+    records, record_bytes = measure(
+        lambda: [record for record in (BreedRecord.from_breed_data(slug, data)
+                                       for slug, data in samples) if record.text])
+
+    print(f"{args.breeds} breeds, memory per breed:")
+    print(f"  breed_info dict                {dict_bytes / args.breeds:>8,.0f} bytes")
+    print(f"  BreedRecord, text cleaned      {record_bytes / args.breeds:>8,.0f} bytes")
+    print(f"  BreedRecord, text not cleaned  {lazy_bytes / args.breeds:>8,.0f} bytes")
+
+    for label, func, items in [
+        ('breed_to_row(dict)', breed_to_row, dicts),
+        ('BreedRecord.to_row()', BreedRecord.to_row, records),
+        ('BreedRecord.to_dict()', BreedRecord.to_dict, records),
+        ('BreedRecord.to_json()', BreedRecord.to_json, records),
+    ]:
+        elapsed = timed(func, items)
+        print(f"{label:<24}{elapsed / len(items) * 1e6:>10.1f} us per breed")
+
+    mismatched = sum(1 for d, record in zip(dicts, records) if breed_to_row(d) != record.to_row())
+    if mismatched:
+        print(f"{mismatched} records convert to different rows than their dicts!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from breed_loader import BulkBreedLoader  # noqa: E402
+from breed_parser import extract_breed_info  # noqa: E402
+from db import connect  # noqa: E402
+
+
+def sample_breeds(count):
+    """Builds `count` breed_info dicts from the saved fixture page"""
+    with open(os.path.join(ROOT, 'page_source.html'), 'r', encoding='utf-8') as f:
+        template = extract_breed_info('affenpinscher', f.read())
+
+    breeds = []
+    for i in range(count):
+        breed = dict(template, traits=dict(template['traits']))
+        breed['name'] = f"{template['name']} {i}"
+        breed['slug'] = f"{template['slug']}-{i}"
+        breeds.append(breed)
+    return breeds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure dog_breeds insert throughput")
+    parser.add_argument('--rows', type=int, default=290)
+    parser.add_argument('--method', choices=['values', 'copy'], default='values')
+    args = parser.parse_args()
+
+    conn = connect()
+    breeds = sample_breeds(args.rows)
+
+    # Load into a scratch copy of dog_breeds so real data is never touched
+    with conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE dog_breeds_bench (LIKE dog_breeds INCLUDING ALL)")
+    conn.commit()
+
+    results = {}
+    for label, batch_size in [('1', 1), ('50', 50), ('all', 0)]:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE dog_breeds_bench")
+        conn.commit()
+
+        loader = BulkBreedLoader(conn, batch_size=batch_size, method=args.method,
+                                 table='dog_breeds_bench')
+        start = time.perf_counter()
+        for breed in breeds:
+            loader.add(breed)
+        loader.close()
+        elapsed = time.perf_counter() - start
+
+        results[label] = {'rows': loader.inserted, 'seconds': round(elapsed, 4),
+                          'rows_per_sec': round(loader.inserted / elapsed, 1)}
+        print(f"batch size {label:>4}: {loader.inserted} rows in {elapsed:.3f}s "
+              f"({loader.inserted / elapsed:,.0f} rows/sec)")
+
+    conn.close()
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from breed_props import extract_breed_props  # noqa: E402
+from html_text import html_to_text  # noqa: E402
+
+
+FIXTURES = ['example.html', 'page_source.html']
+
+# Markup the fixture pages don't exercise, checked against the soup output too
+GOLDEN_CASES = [
+    '<p>Tom &amp; Jerry&#8217;s&nbsp;&eacute;</p>\n<ul><li>one</li><li>two</li></ul>',
+    '<p>a <a href="/x" title="a>b">link</a> <strong>b</strong><br/>c</p>',
+    '<!-- note --><p>x</p><script>var a = "<p>";</script><style>p {}</style>',
+    'weights < 10 lbs and > 5 lbs, &lt;p&gt; is literal',
+    '  <p> spaced </p>  ',
+    # Whitespace-only text between tags becomes a single newline or space
+    '<p>a</p>\n\n<p>b</p>',
+    '<p>a</p>\n \n<p>b</p>',
+    '<p>a</p>\t<b>b</b> <!-- c --> <i>d</i>',
+    '<p>a</p>\n<script>x</script>\n<p>b</p>',
+    '<p>a</p> &nbsp; <p>b</p>&#32;\n<p>c</p>',
+    # ...except inside <pre> and <textarea>
+    'a<pre>\n\n</pre>b<textarea> </textarea>c',
+    '<![CDATA[x]]>y',
+    'a<![CDATA[ a>b ]]>c',
+    'plain text',
+    '',
+]
+
+
+def soup_text(html_content):
+    """The original BeautifulSoup-based _clean_html, kept as the baseline"""
+    if not html_content:
+        return ""
+    return BeautifulSoup(html_content, 'html.parser').get_text().strip()
+
+
+def fixture_fragments():
+    """Every HTML-bearing string in the breed_data of the fixture pages"""
+    fragments = []
+    for name in FIXTURES:
+        with open(os.path.join(ROOT, name), 'r', encoding='utf-8') as f:
+            breed_data = extract_breed_props(f.read())['settings']['breed_data']
+        for section in breed_data.values():
+            for fields in section.values():
+                if isinstance(fields, dict):
+                    fragments.extend(value for value in fields.values()
+                                     if isinstance(value, str) and '<' in value)
+    return fragments
+
+
+def bench(func, fragments, number):
+    """Returns the best per-fragment time in seconds over a few repeats"""
+    runs = timeit.repeat(lambda: [func(fragment) for fragment in fragments],
+                         number=number, repeat=3)
+    return min(runs) / number / len(fragments)
+
+
+def main():
+    fragments = fixture_fragments()
+
+    mismatches = 0
+    for fragment in fragments + GOLDEN_CASES:
+        if soup_text(fragment) != html_to_text(fragment):
+            mismatches += 1
+            print(f"Output differs from BeautifulSoup for {fragment[:60]!r}")
+    print(f"{len(fragments) + len(GOLDEN_CASES) - mismatches} of "
+          f"{len(fragments) + len(GOLDEN_CASES)} fragments identical to BeautifulSoup")
+
+    soup_time = bench(soup_text, fragments, 20)
+    fast_time = bench(html_to_text, fragments, 500)
+    print(f"{len(fragments)} fixture fragments: soup {soup_time * 1e6:.1f} us, "
+          f"fast {fast_time * 1e6:.1f} us per fragment ({soup_time / fast_time:.1f}x)")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
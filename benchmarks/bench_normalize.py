@@ -0,0 +1,124 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bench_breed_record import sample_breed_data  # noqa: E402
+from breed_fields import TRAIT_COLUMNS, parse_range, to_int  # noqa: E402
+from breed_normalize import NormalizedBreeds, normalize_breeds, raw_columns  # noqa: E402
+from breed_record import BreedRecord  # noqa: E402
+
+
+# (section, key, bad value, field it should be reported under)
+FAULTS = [
+    ('basics', 'year_recognized', 'unknown', 'year_recognized'),
+    ('basics', 'life_expectancy', 'varies', 'life_expectancy'),
+    ('basics', 'popularity_2023', 'n/a', 'popularity_2023'),
+    ('standards', 'height_min', '-3', 'height_min'),
+    ('traits', 'watchdogprotective_nature', 9, 'watchdog_protective_nature'),
+]
+
+
+def inject_faults(samples, fraction, seed=0):
+    """Breaks one field of `fraction` of the samples, returning {index: field broken}"""
+    rng = random.Random(seed)
+    broken = {}
+    for i in rng.sample(range(len(samples)), int(len(samples) * fraction)):
+        slug, breed_data = samples[i]
+        section, key, value, field = rng.choice(FAULTS)
+        if section == 'traits':
+            breed_data['traits'][slug]['traits'][key]['score'] = value
+        else:
+            breed_data[section][slug][key] = value
+        broken[i] = field
+    return broken
+
+
+def scalar_normalize(slug, breed_data):
+    """What the per-record path makes of the same fields, one breed at a time"""
+    record = BreedRecord.from_breed_data(slug, breed_data)
+    return ((to_int(record.year_recognized), to_int(record.popularity))
+            + tuple(score or None for score in record.scores)
+            + parse_range(record.life_expectancy)
+            + (record.height_min, record.height_max, record.weight_min, record.weight_max))
+
+
+def normalized_values(frame):
+    """scalar_normalize's tuple for every row of a normalized frame"""
+    columns = (['year_recognized', 'popularity'] + TRAIT_COLUMNS
+               + ['life_expectancy_min', 'life_expectancy_max',
+                  'height_min', 'height_max', 'weight_min', 'weight_max'])
+    return [tuple(None if pd.isna(value) else value for value in row)
+            for row in frame[columns].astype(object).itertuples(index=False)]
+
+
+def best_of(repeat, func):
+    """func's result and its best time, with the garbage collector off like timeit does"""
+    best = float('inf')
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time batch normalization against the per-record conversions")
+    parser.add_argument('--breeds', type=int, default=5000)
+    parser.add_argument('--bad-fraction', type=float, default=0.02,
+                        help="share of breeds with one invalid field")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--fixture', default='page_source.html')
+    args = parser.parse_args()
+
+    samples = sample_breed_data(args.breeds, args.fixture)
+    broken = inject_faults(samples, args.bad_fraction)
+
+    normalized, batch_seconds = best_of(args.repeat, lambda: normalize_breeds(samples))
+    columns, gather_seconds = best_of(args.repeat, lambda: raw_columns(samples))
+    _, check_seconds = best_of(args.repeat, lambda: NormalizedBreeds(columns))
+    scalar, scalar_seconds = best_of(
+        args.repeat, lambda: [scalar_normalize(slug, data) for slug, data in samples])
+
+    print(f"{args.breeds} breeds, {len(broken)} with an invalid field:")
+    for label, seconds in [('normalize_breeds', batch_seconds),
+                           ('  raw_columns', gather_seconds),
+                           ('  column checks', check_seconds),
+                           ('per-record conversions', scalar_seconds)]:
+        print(f"  {label:<24}{seconds * 1000:>10.1f} ms {args.breeds / seconds:>12,.0f} breeds/sec")
+    print(normalized.summary())
+
+    failures = []
+    expected = {}
+    for field in broken.values():
+        expected[field] = expected.get(field, 0) + 1
+    if normalized.error_counts() != expected:
+        failures.append(f"error report {normalized.error_counts()} != injected {expected}")
+
+    mismatched = [samples[i][0] for i, (batch, record) in
+                  enumerate(zip(normalized_values(normalized.frame), scalar))
+                  if i not in broken and batch != record]
+    if mismatched:
+        failures.append(f"{len(mismatched)} clean breeds normalize differently from their "
+                        f"records, e.g. {mismatched[0]}")
+
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
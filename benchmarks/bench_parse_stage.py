@@ -0,0 +1,53 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from parse_stage import find_pages, parse_pages  # noqa: E402
+
+
+FIXTURE_BREED = 'affenpinscher'
+
+
+def build_archive(directory, count, fixture):
+    """Writes `count` copies of the fixture page, each rewritten to its own slug"""
+    with open(os.path.join(ROOT, fixture), 'r', encoding='utf-8') as f:
+        page = f.read()
+    for i in range(count):
+        slug = f"synthetic-breed-{i:05d}"
+        with open(os.path.join(directory, f"{slug}.html"), 'w', encoding='utf-8') as f:
+            f.write(page.replace(FIXTURE_BREED, slug))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure parse stage throughput by worker count")
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--fixture', default='example.html')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='breed_pages_')
+    try:
+        build_archive(directory, args.pages, args.fixture)
+        pages = find_pages(directory)
+        print(f"{len(pages)} synthetic pages from {args.fixture} ({os.cpu_count()} CPUs)")
+
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            parsed = sum(1 for _, breed_info, _ in parse_pages(pages, workers) if breed_info)
+            elapsed = time.perf_counter() - start
+            rate = len(pages) / elapsed
+            baseline = baseline or rate
+            print(f"{workers:>2} workers: {parsed} pages in {elapsed:.2f}s "
+                  f"({rate:,.1f} pages/sec, {rate / baseline:.2f}x)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
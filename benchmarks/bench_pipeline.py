@@ -0,0 +1,198 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import psycopg2
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bench_clean_html import fixture_fragments  # noqa: E402
+from breed_loader import BulkBreedLoader  # noqa: E402
+from breed_parser import clean_html, extract_breed_info  # noqa: E402
+from record_stream import read_records  # noqa: E402
+from scraper import extract_breed_data  # noqa: E402
+from snapshot_diff import snapshot_paths  # noqa: E402
+from url_frontier import UrlFrontier  # noqa: E402
+
+
+FIXTURES = ['example.html', 'page_source.html']
+FIXTURE_BREED = 'affenpinscher'
+
+
+def load_script(filename):
+    """Imports one of the hyphenated top-level scripts as a module"""
+    spec = importlib.util.spec_from_file_location(
+        filename[:-3].replace('-', '_'), os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_fixture(name):
+    with open(os.path.join(ROOT, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def breed_slugs(limit):
+    """Slugs of the newest saved link list in output/"""
+    frontier = UrlFrontier.from_links(
+        read_records(snapshot_paths(os.path.join(ROOT, 'output'))[-1]))
+    return [breed['slug'] for breed in frontier][:limit]
+
+
+class FixtureSession:
+    """Stands in for requests.Session, answering every breed URL with the fixture page"""
+
+    def __init__(self, page):
+        self.page = page
+
+    def get(self, url, **kwargs):
+        slug = url.rstrip('/').rsplit('/', 1)[-1]
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = 'utf-8'
+        response._content = self.page.replace(FIXTURE_BREED, slug).encode('utf-8')
+        return response
+
+
+def measure(func, items, repeat, setup=None):
+    """ops/sec of func over items (best of `repeat` passes) and the peak memory of one pass"""
+    best = float('inf')
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+
+    # Traced separately, tracemalloc slows the timed passes down too much
+    if setup:
+        setup()
+    tracemalloc.start()
+    for item in items:
+        func(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'ops': len(items),
+        'best_seconds': round(best, 4),
+        'ops_per_sec': round(len(items) / best, 1),
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scraper_cases(scraper_module, slugs, pages, repeat):
+    """get_breed_data over a fixture-backed session and insert_breed_data into a scratch table
+
+    get_breed_data doesn't touch the database, so it is measured even without Postgres.
+    """
+    # A rate no fixture run reaches, so pacing doesn't add sleeps to the timings
+    scraper = scraper_module.BreedDetailsScraper(cache_dir=None, archive_dir=None,
+                                                 db_pool_size=1, rate=1e6, burst=1_000_000)
+    results = {}
+    try:
+        scraper.session = FixtureSession(pages['page_source.html'])
+        results['get_breed_data'] = measure(scraper.get_breed_data, slugs, repeat)
+
+        # Upserts go to a temp copy of dog_breeds on the pool's only connection
+        try:
+            with scraper.db.transaction() as cur:
+                cur.execute("CREATE TEMP TABLE dog_breeds_bench (LIKE dog_breeds INCLUDING ALL)")
+        except psycopg2.OperationalError as e:
+            print(f"Postgres unavailable, skipping insert_breed_data: {e}")
+            return results
+        scraper.loader = BulkBreedLoader(scraper.db, table='dog_breeds_bench')
+        template = extract_breed_info(FIXTURE_BREED, pages['page_source.html'])
+        breeds = [dict(template, name=f"{template['name']} {slug}", slug=slug)
+                  for slug in slugs]
+
+        def truncate():
+            with scraper.db.transaction() as cur:
+                cur.execute("TRUNCATE dog_breeds_bench")
+
+        results['insert_breed_data (new)'] = measure(
+            scraper.insert_breed_data, breeds, repeat, setup=truncate)
+        # Same content again: the content hash check turns every upsert into a no-op
+        results['insert_breed_data (unchanged)'] = measure(
+            scraper.insert_breed_data, breeds, repeat)
+    finally:
+        scraper.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scrape-parse-load hot paths on saved fixtures")
+    parser.add_argument('--breeds', type=int, default=50,
+                        help="breeds from the saved link list to fetch and insert")
+    parser.add_argument('--pages', type=int, default=10,
+                        help="fixture pages parsed by extract_breed_data per pass")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="results file, by default "
+                        "benchmarks/results/pipeline_<timestamp>.json")
+    parser.add_argument('--compare', help="an earlier results file to compare against")
+    args = parser.parse_args()
+
+    pages = {name: read_fixture(name) for name in FIXTURES}
+    slugs = breed_slugs(args.breeds)
+
+    cases = {
+        'extract_breed_data': measure(
+            extract_breed_data, [pages[FIXTURES[i % len(FIXTURES)]] for i in range(args.pages)],
+            args.repeat),
+        '_clean_html': measure(clean_html, fixture_fragments(), args.repeat),
+    }
+    cases.update(scraper_cases(load_script('breed-details-scraper.py'), slugs, pages,
+                               args.repeat))
+
+    results = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'cases': cases
+    }
+
+    previous = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)['cases']
+
+    for name, stats in cases.items():
+        line = (f"{name:<30} {stats['ops_per_sec']:>10,.1f} ops/sec "
+                f"{stats['peak_memory_kb']:>10,.1f} KB peak")
+        if name in previous:
+            line += f"  {stats['ops_per_sec'] / previous[name]['ops_per_sec']:.2f}x"
+        print(line)
+
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results',
+        f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
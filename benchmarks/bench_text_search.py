@@ -0,0 +1,130 @@
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from breed_export import rows_from_db  # noqa: E402
+from breed_fields import BREED_COLUMNS, TEXT_COLUMNS  # noqa: E402
+from db import connect  # noqa: E402
+from text_index import BM25Index, search_breeds  # noqa: E402
+
+
+# How the text columns had to be searched before search_vector existed
+SCAN_QUERY = """
+    SELECT slug, name FROM dog_breeds_bench
+    WHERE {}
+    LIMIT %(limit)s
+""".format(' OR '.join(f"{column} ILIKE %(pattern)s" for column in TEXT_COLUMNS))
+
+# (query, slugs it must match) over PHRASE_DOCUMENTS: a stop word inside a
+# phrase has to match too, and a phrase can't run from one field into the next
+PHRASE_DOCUMENTS = [
+    ('with-children', "Gentle", "Good with children and other dogs."),
+    ('for-children', "Gentle", "Good for children who are calm."),
+    ('across-fields', "Loyal guard", "Dog breeds need exercise."),
+]
+PHRASE_CASES = [
+    ('"good with children"', ['with-children']),
+    ('"good for children"', ['for-children']),
+    ('good children', ['for-children', 'with-children']),
+    ('"guard dog"', []),
+    ('"dog breeds"', ['across-fields']),
+]
+
+
+def check_phrases():
+    """Number of PHRASE_CASES the in-process index gets wrong"""
+    index = BM25Index()
+    for slug, *fields in PHRASE_DOCUMENTS:
+        index.add(slug, *fields)
+    mismatches = 0
+    for query, expected in PHRASE_CASES:
+        found = sorted(slug for slug, _ in index.search(query))
+        if found != expected:
+            mismatches += 1
+            print(f"{query!r} matched {found}, expected {expected}")
+    return mismatches
+
+
+def build_bench_table(conn, copies):
+    """Fills a temp copy of dog_breeds with `copies` copies of every breed.
+
+    Only one copy in ten keeps the word "dysplasia", so the query phrase is
+    selective the way it would be on a varied dataset.
+    """
+    texts = ', '.join(
+        f"CASE WHEN mod(copy, 10) = 0 THEN {column} "
+        f"ELSE replace({column}, 'dysplasia', 'displasia') END" for column in TEXT_COLUMNS)
+    other = [column for column in BREED_COLUMNS if column not in TEXT_COLUMNS]
+    values = ', '.join("slug || '-' || copy" if column == 'slug' else column
+                       for column in other)
+    with conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE dog_breeds_bench (LIKE dog_breeds INCLUDING ALL)")
+        cur.execute(f"""
+            INSERT INTO dog_breeds_bench ({', '.join(other + TEXT_COLUMNS)})
+            SELECT {values}, {texts}
+            FROM dog_breeds, generate_series(1, %s) copy
+        """, (copies,))
+        cur.execute("ANALYZE dog_breeds_bench")
+        cur.execute("SELECT count(*) FROM dog_breeds_bench")
+        count = cur.fetchone()[0]
+    conn.commit()
+    return count
+
+
+def timed(func, repeat):
+    """Best wall time of `repeat` runs, with the result of the last one"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure full-text query latency")
+    parser.add_argument('--query', default='hip dysplasia')
+    parser.add_argument('--copies', type=int, default=50,
+                        help="copies of each dog_breeds row in the benchmark table")
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    mismatches = check_phrases()
+    print(f"{len(PHRASE_CASES) - mismatches} of {len(PHRASE_CASES)} phrase checks passed")
+
+    conn = connect()
+    try:
+        count = build_bench_table(conn, args.copies)
+        print(f"{count} rows, query {args.query!r}")
+
+        def scan():
+            with conn.cursor() as cur:
+                cur.execute(SCAN_QUERY, {'pattern': f"%{args.query}%", 'limit': args.limit})
+                return cur.fetchall()
+
+        phrase = f'"{args.query}"'
+        results = [
+            ('ILIKE scan (before)', timed(scan, args.repeat)),
+            ('tsvector + GIN (after)', timed(
+                lambda: search_breeds(conn, phrase, args.limit, 'dog_breeds_bench'),
+                args.repeat)),
+        ]
+
+        build_time, index = timed(
+            lambda: BM25Index.from_rows(rows_from_db(conn, 'dog_breeds_bench')), 1)
+        results.append(('in-process BM25', timed(
+            lambda: index.search(phrase, args.limit), args.repeat)))
+
+        for label, (elapsed, matches) in results:
+            print(f"{label:<24}{elapsed * 1000:>9.2f} ms, {len(matches)} matches")
+        print(f"BM25 index built in {build_time:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import psycopg2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from breed_export import rows_from_db  # noqa: E402
+from breed_fields import TRAIT_COLUMNS  # noqa: E402
+from db import connect  # noqa: E402
+from trait_index import TraitIndex  # noqa: E402
+
+
+def synthetic_index(count, missing, seed=0):
+    """Random 1-5 scores for `count` breeds, with a `missing` fraction left unscored"""
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(1, 6, size=(count, len(TRAIT_COLUMNS))).astype(np.float32)
+    scores[rng.random(scores.shape) < missing] = np.nan
+    return TraitIndex([f"synthetic-breed-{i:06d}" for i in range(count)], scores)
+
+
+def random_preferences(count, seed=1):
+    """Preference dicts over 2-4 random traits, like "low shedding, high trainability" """
+    rng = np.random.default_rng(seed)
+    preferences = []
+    for _ in range(count):
+        traits = rng.choice(TRAIT_COLUMNS, size=rng.integers(2, 5), replace=False)
+        preferences.append({str(trait): int(rng.integers(1, 6)) for trait in traits})
+    return preferences
+
+
+def timed(func, repeat=3):
+    """Best wall time of a few runs, with the result of the last one"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(label, index, queries, k):
+    preferences = random_preferences(queries)
+    slugs = [index.slugs[i % len(index)] for i in range(queries)]
+
+    single, _ = timed(lambda: index.query(preferences[0], k=k))
+    batch, _ = timed(lambda: index.query_batch(preferences, k=k))
+    similar, _ = timed(lambda: index.similar_batch(slugs, k=k))
+    print(f"{label}: {len(index)} breeds")
+    print(f"  single preference query     {single * 1000:>9.3f} ms")
+    print(f"  {queries} preference queries   {batch * 1000:>9.1f} ms "
+          f"({batch / queries * 1e6:.1f} us/query)")
+    print(f"  {queries} breeds-like-X queries {similar * 1000:>9.1f} ms "
+          f"({similar / queries * 1e6:.1f} us/query)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure trait similarity query latency")
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--synthetic', type=int, default=100_000)
+    parser.add_argument('--missing', type=float, default=0.05,
+                        help="fraction of synthetic scores left null")
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        conn = connect()
+        try:
+            report('dog_breeds table', TraitIndex.from_rows(rows_from_db(conn)),
+                   args.queries, args.k)
+        finally:
+            conn.close()
+    except psycopg2.OperationalError as e:
+        print(f"Skipping the dog_breeds table: {e}")
+
+    report('synthetic', synthetic_index(args.synthetic, args.missing), args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
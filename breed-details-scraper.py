@@ -1,269 +1,356 @@
 import requests
-from bs4 import BeautifulSoup
-import json
 import re
-import psycopg2
-from psycopg2.extras import execute_values
-from dotenv import load_dotenv
 import os
 from tqdm import tqdm
 import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from breed_parser import extract_breed_info, empty_breed_data, clean_html, parse_breed_record
+from async_fetcher import AsyncFetcher
+from breed_loader import BulkBreedLoader
+from db import Database
+from http_cache import HttpCache
+from page_archive import PageArchive
+from politeness import PoliteScheduler
+from record_stream import read_records
+from run_metrics import RunMetrics
+from snapshot_diff import SnapshotDiff, snapshot_paths
+from url_frontier import UrlFrontier
+from run_journal import RunJournal, FETCHED, PARSED, LOADED
 
 
 class BreedDetailsScraper:
-    def __init__(self):
-        self.base_url = "https://www.akc.org/dog-breeds/"
-        # Load database configuration
-        load_dotenv()
-        self.db_params = {
-            'dbname': os.getenv('DB_NAME', 'dog_breeds_db'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', ''),
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': os.getenv('DB_PORT', '5432')
-        }
-        self.conn = psycopg2.connect(**self.db_params)
-        self.cur = self.conn.cursor()
+    def __init__(self, base_url="https://www.akc.org/dog-breeds/", cache_dir='.http_cache',
+                 cache_max_mb=500, archive_dir='archive', db_pool_size=4, rate=2.0, burst=4,
+                 max_rate=None):
+        self.base_url = base_url
+        # Stage timings and counters of the run, see process_all_breeds
+        self.metrics = RunMetrics()
+        # Paces every breed page request, starting at `rate` requests/second per host
+        # and speeding up to max_rate while the site answers quickly
+        self.scheduler = PoliteScheduler(rate, burst, max_rate)
+        self.session = self.scheduler.watch(self.metrics.watch(requests.Session()))
+        # Conditional-GET cache for breed pages, disabled with cache_dir=None
+        self.cache = HttpCache(cache_dir, cache_max_mb * 1024 * 1024) if cache_dir else None
+        # Every fetched page is kept here for offline re-parsing, disabled with archive_dir=None
+        self.archive = PageArchive(archive_dir) if archive_dir else None
+        # Connections are borrowed per write, not held through fetches and sleeps.
+        # The pool is opened on first use, so fetching and parsing work without Postgres
+        self.db_pool_size = db_pool_size
+        self._db = None
+        # Writes insert_breed_data's single breeds, created with the pool
+        self.loader = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = Database(maxconn=self.db_pool_size)
+        return self._db
+
+    def close(self):
+        """Closes the database pool, if it was ever opened"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def fetch_breed_page(self, breed_name):
+        """Downloads a breed page when the scheduler allows, raising on HTTP errors"""
+        url = f"{self.base_url}{breed_name}/"
+        html_content = self.scheduler.fetch(self._get, url, self.metrics, breed_name)
+        return self._archive_page(breed_name, html_content)
+
+    def _get(self, url):
+        if self.cache:
+            return self.cache.get(self.session, url)
+        response = self.session.get(url)
+        response.raise_for_status()
+        return response.text
+
+    def _archive_page(self, breed_name, html_content):
+        """Stores a fetched page in the page archive and passes it through"""
+        if self.archive:
+            self.archive.put(breed_name, f"{self.base_url}{breed_name}/", html_content)
+        return html_content
 
     def get_breed_data(self, breed_name):
         """Scrapes breed details from AKC website"""
-        url = f"{self.base_url}{breed_name}/"
-
         try:
             # Make request to get the page
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Find the data-js-props attribute that contains all the breed info
-            breed_div = soup.find('div', {'data-js-component': 'breedPage'})
-            if not breed_div:
-                return self._get_empty_breed_data(breed_name)
-
-            # Parse the JSON data from the data-js-props attribute
-            breed_json = json.loads(breed_div['data-js-props'])
-            breed_data = breed_json['settings']['breed_data']
-
-            # Safely get nested values with defaults
-            basics = breed_data.get('basics', {}).get(breed_name, {})
-            traits = breed_data.get('traits', {}).get(breed_name, {})
-            trait_scores = traits.get('traits', {})
-            health = breed_data.get('health', {}).get(breed_name, {})
-
-            # Helper function to get trait score with validation
-            def get_trait_score(trait_name):
-                try:
-                    score = trait_scores.get(trait_name, {}).get('score')
-                    # Ensure score is between 1-5, otherwise return None
-                    return score if score and 1 <= int(score) <= 5 else None
-                except (TypeError, ValueError):
-                    return None
-
-            # Extract basic information with defaults for missing data
-            breed_info = {
-                "name": basics.get('breed_name', breed_name),
-                "breed_group": basics.get('breed_group'),
-                "origin": basics.get('origin'),
-                "temperament": traits.get('temperament'),
-                "life_expectancy": basics.get('life_expectancy'),
-                "year_recognized": basics.get('year_recognized'),
-                "popularity": basics.get('popularity_2023'),
-                "grooming": self._clean_html(health.get('akc_org_grooming', '')),
-                "exercise": self._clean_html(health.get('akc_org_exercise', '')),
-                "nutrition": self._clean_html(health.get('akc_org_nutrition', '')),
-                "health": self._clean_html(health.get('akc_org_health', '')),
-                "training": self._clean_html(health.get('akc_org_training', '')),
-                "traits": {
-                    "adaptability": get_trait_score('adaptability_level'),
-                    "affectionate_with_family": get_trait_score('affectionate_with_family'),
-                    "barking_level": get_trait_score('barking_level'),
-                    "coat_grooming_frequency": get_trait_score('coat_grooming_frequency'),
-                    "drooling_level": get_trait_score('drooling_level'),
-                    "energy_level": get_trait_score('energy_level'),
-                    "good_with_other_dogs": get_trait_score('good_with_other_dogs'),
-                    "good_with_young_children": get_trait_score('good_with_young_children'),
-                    "mental_stimulation_needs": get_trait_score('mental_stimulation_needs'),
-                    "openness_to_strangers": get_trait_score('openness_to_strangers'),
-                    "playfulness_level": get_trait_score('playfulness_level'),
-                    "shedding_level": get_trait_score('shedding_level'),
-                    "trainability_level": get_trait_score('trainability_level'),
-                    "watchdog_protective_nature": get_trait_score('watchdogprotective_nature')
-                }
-            }
-
-            # Handle coat type and length with better defaults
-            coat_type = trait_scores.get('coat_type', {}).get('selected')
-            coat_length = trait_scores.get('coat_length', {}).get('selected')
-
-            breed_info["coat_type"] = coat_type if coat_type else None
-            breed_info["coat_length"] = coat_length if coat_length else None
-
-            return breed_info
+            html_content = self.fetch_breed_page(breed_name)
+            return self.parse_breed_page(breed_name, html_content)
 
         except Exception as e:
             print(f"Error scraping {breed_name}: {e}")
             return self._get_empty_breed_data(breed_name)
 
+    def parse_breed_page(self, breed_name, html_content):
+        """Parses breed details out of a breed page"""
+        try:
+            return self.extract_breed_info(breed_name, html_content)
+        except Exception as e:
+            print(f"Error parsing {breed_name}: {e}")
+            return self._get_empty_breed_data(breed_name)
+
+    def extract_breed_info(self, breed_name, html_content):
+        """Like parse_breed_page, but raises instead of returning empty data"""
+        return extract_breed_info(breed_name, html_content)
+
+    def parse_breed_record(self, breed_name, html_content):
+        """Like extract_breed_info, but returns a BreedRecord for the loader"""
+        return parse_breed_record(breed_name, html_content)
+
     def _get_empty_breed_data(self, breed_name):
         """Returns an empty breed data structure with the breed name"""
-        return {
-            "name": breed_name,
-            "breed_group": None,
-            "origin": None,
-            "temperament": None,
-            "life_expectancy": None,
-            "year_recognized": None,
-            "popularity": None,
-            "grooming": None,
-            "exercise": None,
-            "nutrition": None,
-            "health": None,
-            "training": None,
-            "traits": {
-                "adaptability": None,
-                "affectionate_with_family": None,
-                "barking_level": None,
-                "coat_grooming_frequency": None,
-                "drooling_level": None,
-                "energy_level": None,
-                "good_with_other_dogs": None,
-                "good_with_young_children": None,
-                "mental_stimulation_needs": None,
-                "openness_to_strangers": None,
-                "playfulness_level": None,
-                "shedding_level": None,
-                "trainability_level": None,
-                "watchdog_protective_nature": None
-            },
-            "coat_type": None,
-            "coat_length": None
-        }
+        return empty_breed_data(breed_name)
 
     def _clean_html(self, html_content):
         """Removes HTML tags from content"""
-        if not html_content:
-            return ""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        return soup.get_text().strip()
+        return clean_html(html_content)
 
     def insert_breed_data(self, breed_data):
-        """Insert breed data into database"""
+        """Insert or refresh breed data in the database"""
         try:
-            query = """
-                INSERT INTO dog_breeds (
-                    name, breed_group, origin, temperament, life_expectancy,
-                    year_recognized, popularity, grooming, exercise, nutrition,
-                    health, training, adaptability, affectionate_with_family,
-                    barking_level, coat_grooming_frequency, drooling_level,
-                    energy_level, good_with_other_dogs, good_with_young_children,
-                    mental_stimulation_needs, openness_to_strangers,
-                    playfulness_level, shedding_level, trainability_level,
-                    watchdog_protective_nature, coat_type, coat_length
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-            """
-
-            # Prepare coat arrays, ensuring they're never empty
-            coat_type = [breed_data['coat_type']
-                         ] if breed_data['coat_type'] else ['Unknown']
-            coat_length = [breed_data['coat_length']
-                           ] if breed_data['coat_length'] else ['Unknown']
-
-            values = (
-                breed_data['name'],
-                breed_data['breed_group'],
-                breed_data['origin'],
-                breed_data['temperament'],
-                breed_data['life_expectancy'],
-                breed_data['year_recognized'],
-                breed_data['popularity'],
-                breed_data['grooming'] or None,  # Convert empty string to None
-                breed_data['exercise'] or None,
-                breed_data['nutrition'] or None,
-                breed_data['health'] or None,
-                breed_data['training'] or None,
-                breed_data['traits']['adaptability'],
-                breed_data['traits']['affectionate_with_family'],
-                breed_data['traits']['barking_level'],
-                breed_data['traits']['coat_grooming_frequency'],
-                breed_data['traits']['drooling_level'],
-                breed_data['traits']['energy_level'],
-                breed_data['traits']['good_with_other_dogs'],
-                breed_data['traits']['good_with_young_children'],
-                breed_data['traits']['mental_stimulation_needs'],
-                breed_data['traits']['openness_to_strangers'],
-                breed_data['traits']['playfulness_level'],
-                breed_data['traits']['shedding_level'],
-                breed_data['traits']['trainability_level'],
-                breed_data['traits']['watchdog_protective_nature'],
-                coat_type,
-                coat_length
-            )
-
-            self.cur.execute(query, values)
-            self.conn.commit()
-            return True
+            if self.loader is None:
+                self.loader = BulkBreedLoader(self.db)
+            return self.loader.upsert(breed_data)
         except Exception as e:
-            self.conn.rollback()
             print(f"Error inserting {breed_data['name']}: {e}")
             return False
 
-    def process_all_breeds(self, json_file):
-        """Process all breeds from JSON file"""
+    def _fetch_serially(self, breed_names, journal, loader):
+        """Fetches and parses breeds one at a time, journaling each step"""
+        for breed_name in tqdm(breed_names, desc="Processing breeds"):
+            stage = 'fetch'
+            try:
+                html_content = self.fetch_breed_page(breed_name)
+                journal.mark(breed_name, FETCHED)
+                stage = 'parse'
+                with self.metrics.stage(stage, breed_name):
+                    record = self.parse_breed_record(breed_name, html_content)
+                journal.mark(breed_name, PARSED)
+                loader.add(record)
+            except Exception as e:
+                print(f"Failed to get data for {breed_name}: {e}")
+                self.metrics.count(f"{stage}_failures")
+                journal.fail(breed_name, e)
+
+    def _fetch_concurrently(self, breed_names, journal, loader, workers):
+        """Fetches and parses breeds with the async fetcher, journaling each as it finishes
+
+        Parsed breeds are handed to a single loader thread, so batch writes
+        (and the journal) never block the event loop driving the fetches.
+        """
+        def store(breed_name, record, error):
+            if record is None:
+                journal.fail(breed_name, error or 'unknown error')
+                return
+            journal.mark(breed_name, PARSED)
+            loader.add(record)
+
+        stored = []
+        with ThreadPoolExecutor(max_workers=1) as loader_thread:
+            fetcher = AsyncFetcher(
+                lambda breed_name, html_content: self.parse_breed_record(
+                    breed_name, self._archive_page(breed_name, html_content)),
+                workers=workers, cache=self.cache, metrics=self.metrics,
+                on_result=lambda *result: stored.append(loader_thread.submit(store, *result)),
+                scheduler=self.scheduler)
+            fetcher.run(
+                (breed_name, f"{self.base_url}{breed_name}/") for breed_name in breed_names)
+        for future in stored:
+            future.result()
+
+    def process_all_breeds(self, links_file, concurrent=False, workers=8, batch_size=50, load_method='values', skip_existing=False,
+                           journal_path=None, max_attempts=3, report_path=None,
+                           prometheus_path=None, only_slugs=None):
+        """Process all breeds from a link list (NDJSON, or a JSON list from older runs)
+
+        With concurrent=True pages are fetched by the async fetcher (bounded
+        worker pool), otherwise one at a time; either way requests are paced
+        by the scraper's PoliteScheduler. Parsed breeds are upserted by a BulkBreedLoader in batches
+        of `batch_size` (0 means a single batch at the end); breeds whose
+        content is unchanged are not written. skip_existing=True doesn't fetch
+        breeds that are already in the database at all, and only_slugs, if
+        given, limits the run to those breeds (see SnapshotDiff).
+
+        Progress is recorded in a run journal (by default next to links_file),
+        so running again over the same file after an interrupted run resumes
+        where it stopped. A run that gets to the end removes its journal, so
+        the next one refreshes every breed again. Failed breeds are retried
+        with exponential backoff up to max_attempts times.
+
+        Time spent per stage (discovery, pacing_wait, fetch, parse, clean,
+        db_write) and per breed, HTTP status codes, bytes received, retries
+        and failures are written as JSON to report_path and, in Prometheus
+        text format, to prometheus_path when given. 'fetch' is the HTTP
+        request alone, waiting for a request slot is 'pacing_wait'.
+        """
+        if journal_path is None:
+            journal_path = os.path.splitext(links_file)[0] + '.journal.jsonl'
+        journal = RunJournal(journal_path, max_attempts=max_attempts)
+        loader = BulkBreedLoader(
+            self.db, batch_size=batch_size, method=load_method, metrics=self.metrics,
+            on_result=lambda record, error: (
+                journal.fail(record.slug, error) if error
+                else journal.mark(record.slug, LOADED)))
+        completed = False
         try:
-            with open(json_file, 'r') as f:
-                breeds = json.load(f)
-
-            print(f"Found {len(breeds)} breeds to process")
-
-            for breed in tqdm(breeds, desc="Processing breeds"):
-                # Extract breed name from URL
-                breed_name = breed['url'].split('/')[-2]
-
-                # Check if breed already exists in database
-                self.cur.execute(
-                    "SELECT name FROM dog_breeds WHERE name = %s", (breed['name'],))
-                if self.cur.fetchone():
-                    print(
-                        f"Skipping {breed['name']} - already exists in database")
-                    continue
-
-                # Get breed data
-                breed_data = self.get_breed_data(breed_name)
-
-                if breed_data:
-                    if self.insert_breed_data(breed_data):
-                        print(f"Successfully processed {breed['name']}")
-                    else:
-                        print(f"Failed to insert {breed['name']}")
+            with self.metrics.stage('discovery'):
+                # Drops duplicate URLs and gives each breed its slug
+                frontier = UrlFrontier.from_links(read_records(links_file))
+
+                print(f"Found {len(frontier)} breeds to process")
+
+                # Load existing breed slugs once instead of querying per breed
+                existing = loader.existing_slugs() if skip_existing else set()
+                pending = []
+                for breed in frontier:
+                    if only_slugs is not None and breed['slug'] not in only_slugs:
+                        continue
+                    if breed['slug'] in existing:
+                        print(
+                            f"Skipping {breed['name']} - already exists in database")
+                        continue
+                    pending.append(breed)
+
+                # Breed names in AKC URLs are the slugs
+                breed_names = [breed['slug'] for breed in pending]
+
+                todo = journal.todo(breed_names)
+            self.metrics.count('breeds_found', len(frontier))
+            self.metrics.count('breeds_skipped', len(frontier) - len(pending))
+
+            if len(todo) < len(breed_names):
+                print(f"Resuming from {journal_path}: {len(breed_names) - len(todo)} "
+                      f"breeds already loaded or failed, {len(todo)} to go")
+
+            while todo:
+                if concurrent:
+                    self._fetch_concurrently(todo, journal, loader, workers)
                 else:
-                    print(f"Failed to get data for {breed['name']}")
-
-                # Be nice to the server
-                time.sleep(2)
+                    self._fetch_serially(todo, journal, loader)
+                loader.flush()
+
+                # Wait out the backoff of the earliest failure, if any can be retried
+                retry_at = journal.next_retry_at(breed_names)
+                if retry_at is None:
+                    break
+                delay = retry_at - time.time()
+                if delay > 0:
+                    print(f"Retrying failed breeds in {delay:.0f}s")
+                    time.sleep(delay)
+                todo = journal.todo(breed_names)
+                self.metrics.count('retries', len(todo))
+
+            print(f"Run journal: {journal.summary(breed_names)}")
+            completed = True
 
         except Exception as e:
             print(f"Error processing breeds: {e}")
         finally:
-            self.cur.close()
-            self.conn.close()
+            # Write out whatever was parsed before closing the connection
+            loader.close()
+            journal.close()
+            # Only an interrupted run is resumed, the next full run starts from scratch
+            if completed and os.path.exists(journal_path):
+                os.remove(journal_path)
+            print(f"Inserted {loader.inserted}, updated {loader.updated}, "
+                  f"unchanged {loader.unchanged} breeds, {len(loader.failed)} failed")
+            self.metrics.count('breeds_inserted', loader.inserted)
+            self.metrics.count('breeds_updated', loader.updated)
+            self.metrics.count('breeds_unchanged', loader.unchanged)
+            self.metrics.count('load_failures', len(loader.failed))
+            self.metrics.count('http_retries', self.scheduler.retries)
+            print(self.metrics.summary())
+            if report_path:
+                self.metrics.write_json(report_path)
+                print(f"Run report saved to {report_path}")
+            if prometheus_path:
+                self.metrics.write_prometheus(prometheus_path)
+            if self.cache:
+                print(self.cache.summary())
+            print(self.scheduler.summary())
+            print(self.db.summary())
+            self.close()
 
 
 def main():
-    scraper = BreedDetailsScraper()
-
-    # Use the most recent JSON file in the output directory
-    json_files = [f for f in os.listdir('output') if f.endswith('.json')]
-    if not json_files:
-        print("No JSON files found in output directory")
+    parser = argparse.ArgumentParser(description="Scrape AKC breed details into Postgres")
+    parser.add_argument('--concurrent', action='store_true',
+                        help="fetch pages with the async fetcher instead of one at a time")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help="starting requests per second per host, adapted to the responses")
+    parser.add_argument('--max-rate', type=float,
+                        help="fastest the rate may grow to, by default 4x --rate")
+    parser.add_argument('--burst', type=int, default=4)
+    parser.add_argument('--base-url', default="https://www.akc.org/dog-breeds/")
+    parser.add_argument('--batch-size', type=int, default=50,
+                        help="breeds per insert batch, 0 for a single batch")
+    parser.add_argument('--load-method', choices=['values', 'copy'], default='values')
+    parser.add_argument('--cache-dir', default='.http_cache',
+                        help="where fetched pages are cached for conditional GETs")
+    parser.add_argument('--cache-max-mb', type=int, default=500)
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--archive-dir', default='archive',
+                        help="content-addressed store of every fetched page")
+    parser.add_argument('--no-archive', action='store_true')
+    parser.add_argument('--db-pool-size', type=int, default=4,
+                        help="most database connections open at once")
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help="attempts per breed before giving up on it")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore the journal of an interrupted run over the same file")
+    parser.add_argument('--skip-existing', action='store_true',
+                        help="don't refetch breeds that are already in the database")
+    parser.add_argument('--changed-only', action='store_true',
+                        help="only fetch breeds added or changed since the previous link list")
+    parser.add_argument('--report',
+                        help="JSON run report path, by default output/run_report_<timestamp>.json")
+    parser.add_argument('--prometheus',
+                        help="also write the run metrics in Prometheus text format here")
+    args = parser.parse_args()
+
+    scraper = BreedDetailsScraper(base_url=args.base_url,
+                                  cache_dir=None if args.no_cache else args.cache_dir,
+                                  cache_max_mb=args.cache_max_mb,
+                                  archive_dir=None if args.no_archive else args.archive_dir,
+                                  db_pool_size=args.db_pool_size, rate=args.rate,
+                                  burst=args.burst, max_rate=args.max_rate)
+
+    # Use the most recent link list in the output directory
+    snapshots = snapshot_paths('output')
+    if not snapshots:
+        print("No link lists (.json, .ndjson, .ndjson.gz) found in output directory")
         return
 
-    latest_json = max([os.path.join('output', f)
-                      for f in json_files], key=os.path.getctime)
-    print(f"Using {latest_json}")
-
-    scraper.process_all_breeds(latest_json)
+    latest_links = snapshots[-1]
+    print(f"Using {latest_links}")
+
+    only_slugs = None
+    if args.changed_only:
+        if len(snapshots) > 1:
+            diff = SnapshotDiff.from_files(snapshots[-2], latest_links)
+            print(f"Since {snapshots[-2]}: {diff.summary()}")
+            for slug in diff.removed:
+                print(f"No longer listed: {slug}")
+            only_slugs = set(diff.changed_slugs())
+        else:
+            print("No previous link list to compare with, fetching every breed")
+
+    journal_path = os.path.splitext(latest_links)[0] + '.journal.jsonl'
+    if args.restart and os.path.exists(journal_path):
+        os.remove(journal_path)
+
+    scraper.process_all_breeds(latest_links, concurrent=args.concurrent,
+                               workers=args.workers, batch_size=args.batch_size, load_method=args.load_method,
+                               skip_existing=args.skip_existing,
+                               journal_path=journal_path, max_attempts=args.max_attempts,
+                               report_path=args.report or os.path.join(
+                                   'output',
+                                   f"run_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"),
+                               prometheus_path=args.prometheus, only_slugs=only_slugs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,387 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from breed_fields import BREED_COLUMNS, TRAIT_COLUMNS
+from breed_loader import CHANGES_CHANNEL
+from db import Database, connect
+
+
+# Everything stored for a breed except the loader's bookkeeping
+API_COLUMNS = [column for column in BREED_COLUMNS if column != 'content_hash']
+SUMMARY_COLUMNS = ['slug', 'name', 'breed_group'] + TRAIT_COLUMNS
+
+BREED_PATH_RE = re.compile(r'^/breeds/([a-z0-9-]+)/?$')
+_TRAIT_RANGE = re.compile(r'^([1-5])(?:-([1-5]))?$')
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Keep-alive connections idle for longer than this are closed
+IDLE_TIMEOUT = 15
+
+_REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class ResponseCache:
+    """LRU cache of rendered responses that expire after ttl seconds.
+
+    invalidate() empties it and bumps the generation; a response rendered
+    from a query that started before the bump is not stored, so a write
+    racing a read can't leave stale data behind.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, generation):
+        if generation != self.generation or self.max_entries <= 0:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self):
+        self.entries.clear()
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+            'invalidations': self.invalidations
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['entries']} entries, {stats['invalidations']} invalidations")
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _breed_json(columns, row):
+    """A breed row as JSON, with the trait scores nested like breed_info"""
+    breed = dict(zip(columns, row))
+    traits = {column: breed.pop(column) for column in TRAIT_COLUMNS if column in breed}
+    if traits:
+        breed['traits'] = traits
+    return breed
+
+
+def _int_param(params, name, default, maximum=None):
+    try:
+        value = int(params.pop(name, default))
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if value < 0:
+        raise BadRequest(f"{name} can't be negative")
+    return min(value, maximum) if maximum else value
+
+
+class BreedApi:
+    """Read-only JSON API over dog_breeds, served with asyncio.
+
+    GET /breeds/<slug>                  one breed
+    GET /breeds?group=&<trait>=&limit=&offset=
+                                        a page of breed summaries; trait
+                                        filters take a score (5) or a range (1-2)
+    GET /groups                         breed groups and their sizes
+    GET /stats                          cache and pool counters
+
+    Queries run on a thread pool against a Database pool. Rendered responses
+    are cached in a ResponseCache and carry an ETag, so If-None-Match gets a
+    304. A dedicated connection LISTENs for the loaders' change
+    notifications and empties the cache when the table is written.
+    Concurrent misses for the same URL share a single query.
+    """
+
+    def __init__(self, db, cache=None, table='dog_breeds'):
+        self.db = db
+        self.cache = cache if cache is not None else ResponseCache()
+        self.table = table
+        self.executor = ThreadPoolExecutor(max_workers=db.maxconn)
+        self.listener = None
+        # cache key -> future of the response being rendered for it
+        self.inflight = {}
+
+    # Queries, run on the executor
+
+    def _query(self, sql, params=()):
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            conn.commit()
+            return rows
+
+    def _breed(self, slug):
+        rows = self._query(
+            f"SELECT {', '.join(API_COLUMNS)} FROM {self.table} WHERE slug = %s", (slug,))
+        if not rows:
+            return 404, {'error': f"No breed {slug}"}
+        return 200, _breed_json(API_COLUMNS, rows[0])
+
+    def _groups(self):
+        rows = self._query(f"""
+            SELECT breed_group, count(*) FROM {self.table}
+            GROUP BY breed_group ORDER BY breed_group NULLS LAST
+        """)
+        return 200, [{'group': group, 'breeds': count} for group, count in rows]
+
+    def _breeds(self, params):
+        limit = _int_param(params, 'limit', DEFAULT_LIMIT, MAX_LIMIT)
+        offset = _int_param(params, 'offset', 0)
+        conditions, values = [], []
+        if 'group' in params:
+            conditions.append("breed_group = %s")
+            values.append(params.pop('group'))
+        for column in TRAIT_COLUMNS:
+            if column not in params:
+                continue
+            match = _TRAIT_RANGE.match(params.pop(column))
+            if not match:
+                raise BadRequest(f"{column} must be a score from 1 to 5 or a range like 1-2")
+            conditions.append(f"{column} BETWEEN %s AND %s")
+            values += [int(match.group(1)), int(match.group(2) or match.group(1))]
+        if params:
+            raise BadRequest(f"Unknown parameters: {', '.join(sorted(params))}")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self._query(f"""
+            SELECT {', '.join(SUMMARY_COLUMNS)}, count(*) OVER ()
+            FROM {self.table} {where}
+            ORDER BY slug LIMIT %s OFFSET %s
+        """, values + [limit, offset])
+        if rows:
+            total = rows[0][-1]
+        else:
+            total = self._query(f"SELECT count(*) FROM {self.table} {where}", values)[0][0]
+        return 200, {
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'breeds': [_breed_json(SUMMARY_COLUMNS, row[:-1]) for row in rows]
+        }
+
+    def _route(self, path, params):
+        """(status, payload) for a GET, run on the executor"""
+        match = BREED_PATH_RE.match(path)
+        if match:
+            if params:
+                raise BadRequest(f"Unknown parameters: {', '.join(sorted(params))}")
+            return self._breed(match.group(1))
+        if path in ('/breeds', '/breeds/'):
+            return self._breeds(params)
+        if path == '/groups':
+            return self._groups()
+        return 404, {'error': f"No route for {path}"}
+
+    # Responses
+
+    async def _render(self, path, params):
+        """(status, body, etag) for a GET; errors are rendered, never raised"""
+        loop = asyncio.get_running_loop()
+        try:
+            status, payload = await loop.run_in_executor(self.executor, self._route, path, params)
+        except BadRequest as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            print(f"Error serving {path}: {e}")
+            status, payload = 500, {'error': 'internal error'}
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        return status, body, '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    async def respond(self, method, target, headers):
+        """(status, body, extra headers) for one request"""
+        if method not in ('GET', 'HEAD'):
+            body = json.dumps({'error': f"{method} not allowed"}).encode('utf-8')
+            return 405, body, {'Allow': 'GET, HEAD'}
+
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+        if path == '/stats':
+            stats = {'cache': self.cache.stats(), 'pool': self.db.stats()}
+            return 200, json.dumps(stats).encode('utf-8'), {'Cache-Control': 'no-store'}
+
+        params = dict(parse_qsl(parts.query))
+        key = f"{path}?{urlencode(sorted(params.items()))}"
+        entry = self.cache.get(key)
+        if entry is None:
+            pending = self.inflight.get(key)
+            if pending is not None:
+                entry = await asyncio.shield(pending)
+            else:
+                generation = self.cache.generation
+                pending = asyncio.get_running_loop().create_future()
+                self.inflight[key] = pending
+                try:
+                    entry = await self._render(path, dict(params))
+                    pending.set_result(entry)
+                finally:
+                    del self.inflight[key]
+                    if not pending.done():
+                        pending.cancel()
+                if entry[0] in (200, 404):
+                    self.cache.put(key, entry, generation)
+
+        status, body, etag = entry
+        # Clients may keep responses, but must revalidate since writes invalidate them
+        extra = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if status == 200 and etag in {tag.strip() for tag in
+                                      headers.get('if-none-match', '').split(',')}:
+            return 304, b'', extra
+        return status, body, extra
+
+    # Cache invalidation
+
+    def _listen(self):
+        self.listener = connect(**self.db.params)
+        self.listener.autocommit = True
+        with self.listener.cursor() as cur:
+            cur.execute(f"LISTEN {CHANGES_CHANNEL}")
+        asyncio.get_running_loop().add_reader(self.listener.fileno(), self._on_notify)
+
+    def _on_notify(self):
+        self.listener.poll()
+        tables = {notify.payload for notify in self.listener.notifies}
+        self.listener.notifies.clear()
+        if self.table in tables:
+            self.cache.invalidate()
+
+    # HTTP
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    self._write(writer, 400, b'{"error": "malformed request"}', {}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = headers.get('content-length', '0')
+                if length.isdigit() and int(length):
+                    await reader.readexactly(int(length))
+
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                status, body, extra = await self.respond(method, target, headers)
+                self._write(writer, status, b'' if method == 'HEAD' else body, extra,
+                            keep_alive, len(body))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _write(self, writer, status, body, headers, keep_alive, length=None):
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                 f"Content-Length: {len(body) if length is None else length}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status != 304:
+            lines.append("Content-Type: application/json; charset=utf-8")
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+
+    async def serve(self, host='127.0.0.1', port=8080, ready=None):
+        """Serves until cancelled; ready, if given, is called with the bound port"""
+        self._listen()
+        server = await asyncio.start_server(self._handle, host, port)
+        try:
+            if ready:
+                ready(server.sockets[0].getsockname()[1])
+            async with server:
+                await server.serve_forever()
+        finally:
+            asyncio.get_running_loop().remove_reader(self.listener.fileno())
+            self.listener.close()
+            self.executor.shutdown()
+
+
+def start_api_server(db, cache=None, host='127.0.0.1', port=0, table='dog_breeds'):
+    """Runs a BreedApi on a background thread, returning it and the port it listens on"""
+    api = BreedApi(db, cache, table)
+    started = threading.Event()
+    bound = []
+
+    def ready(actual_port):
+        bound.append(actual_port)
+        started.set()
+
+    thread = threading.Thread(target=asyncio.run, args=(api.serve(host, port, ready),),
+                              daemon=True)
+    thread.start()
+    if not started.wait(10):
+        raise RuntimeError("Breed API server didn't start")
+    return api, bound[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dog_breeds as a read-only JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--pool-size', type=int, default=4,
+                        help="database connections for queries")
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help="responses kept in memory, 0 disables the cache")
+    parser.add_argument('--ttl', type=float, default=60.0,
+                        help="seconds a cached response is served without querying again")
+    args = parser.parse_args()
+
+    db = Database(maxconn=args.pool_size)
+    api = BreedApi(db, ResponseCache(args.cache_size, args.ttl))
+    print(f"Serving dog_breeds at http://{args.host}:{args.port}/breeds")
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(api.cache.summary())
+        print(db.summary())
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from breed_fields import (BREED_COLUMNS, RANGE_COLUMNS, TEXT_COLUMNS, TRAIT_COLUMNS, breed_to_row,
+                          to_int)
+from record_stream import read_records
+
+
+# Low-cardinality columns are stored as dictionary indexes into their distinct values
+_CATEGORY = pa.dictionary(pa.int16(), pa.string())
+
+BREED_SCHEMA = pa.schema(
+    [
+        ('slug', pa.string()),
+        ('name', pa.string()),
+        ('breed_group', _CATEGORY),
+        ('origin', _CATEGORY),
+        ('temperament', pa.string()),
+        ('life_expectancy', _CATEGORY),
+        ('year_recognized', pa.int16()),
+        ('popularity', pa.int32()),
+    ]
+    + [(column, pa.string()) for column in TEXT_COLUMNS]
+    + [(column, pa.uint8()) for column in TRAIT_COLUMNS]
+    + [
+        ('coat_type', pa.list_(_CATEGORY)),
+        ('coat_length', pa.list_(_CATEGORY)),
+    ]
+    + [(column, pa.float32()) for column in RANGE_COLUMNS]
+    + [('content_hash', pa.string())]
+)
+
+_INTEGER_COLUMNS = ('year_recognized', 'popularity')
+
+
+def rows_from_db(conn, table='dog_breeds'):
+    """All dog_breeds rows, ordered like BREED_COLUMNS"""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {', '.join(BREED_COLUMNS)} FROM {table} ORDER BY slug")
+        return cur.fetchall()
+
+
+def breed_table(rows):
+    """Builds an Arrow table from dog_breeds rows, breed_info dicts or BreedRecords"""
+    rows = [row if isinstance(row, tuple) else breed_to_row(row) for row in rows]
+    columns = {column: [] for column in BREED_COLUMNS}
+    for row in rows:
+        for column, value in zip(BREED_COLUMNS, row):
+            columns[column].append(value)
+
+    for column in _INTEGER_COLUMNS:
+        columns[column] = [to_int(value) for value in columns[column]]
+    for column in ('content_hash', 'slug'):
+        columns[column] = [value.strip() if value else value for value in columns[column]]
+
+    return pa.table([pa.array(columns[field.name], type=field.type) for field in BREED_SCHEMA],
+                    schema=BREED_SCHEMA)
+
+
+def write_parquet(rows, path, compression='zstd'):
+    """Writes breeds to a Parquet file, returning the Arrow table written"""
+    table = breed_table(rows)
+    pq.write_table(table, path, compression=compression)
+    return table
+
+
+def write_arrow(rows, path):
+    """Writes breeds to an uncompressed Arrow IPC file, which open_breeds can memory-map"""
+    table = breed_table(rows)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return table
+
+
+def open_breeds(path, columns=None):
+    """Opens an exported breed file as an Arrow table.
+
+    Arrow IPC files (.arrow) are memory-mapped, so columns are read from the
+    page cache without being copied. Parquet files have to be decoded, but
+    only the requested columns are read.
+    """
+    if path.endswith('.arrow'):
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.select(columns) if columns else table
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+def load_dataframe(path, columns=None):
+    """Exported breeds as a pandas DataFrame"""
+    return open_breeds(path, columns).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export breed details to Parquet or Arrow for analytics")
+    parser.add_argument('output', help="a .parquet or .arrow file")
+    parser.add_argument('--from-json',
+                        help="breed_info dicts (.json list, .ndjson or .ndjson.gz) "
+                             "instead of the database")
+    parser.add_argument('--table', default='dog_breeds')
+    args = parser.parse_args()
+
+    if args.from_json:
+        rows = list(read_records(args.from_json))
+    else:
+        # Only the database export needs psycopg2
+        from db import connect
+        conn = connect()
+        try:
+            rows = rows_from_db(conn, args.table)
+        finally:
+            conn.close()
+
+    if args.output.endswith('.arrow'):
+        table = write_arrow(rows, args.output)
+    else:
+        table = write_parquet(rows, args.output)
+    print(f"Exported {table.num_rows} breeds to {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import re
+
+from url_frontier import url_slug
+
+
+# Column layout and value conversions of a breed row; nothing here needs the database
+TRAIT_COLUMNS = [
+    'adaptability', 'affectionate_with_family', 'barking_level',
+    'coat_grooming_frequency', 'drooling_level', 'energy_level',
+    'good_with_other_dogs', 'good_with_young_children',
+    'mental_stimulation_needs', 'openness_to_strangers',
+    'playfulness_level', 'shedding_level', 'trainability_level',
+    'watchdog_protective_nature'
+]
+
+TEXT_COLUMNS = ['grooming', 'exercise', 'nutrition', 'health', 'training']
+
+# Numeric bounds parsed from "12-15 years" style text, for range queries
+RANGE_COLUMNS = [
+    'life_expectancy_min', 'life_expectancy_max',
+    'height_min', 'height_max', 'weight_min', 'weight_max'
+]
+
+BREED_COLUMNS = [
+    'slug', 'name', 'breed_group', 'origin', 'temperament', 'life_expectancy',
+    'year_recognized', 'popularity'
+] + TEXT_COLUMNS + TRAIT_COLUMNS + ['coat_type', 'coat_length'] + RANGE_COLUMNS + [
+    'content_hash'
+]
+
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+# "Up to 18 pounds" states a maximum only
+_UP_TO = re.compile(r'\bup to\b', re.IGNORECASE)
+
+
+def slugify(name):
+    """Slug derived from a breed name ("Alaskan Klee Kai" -> "alaskan-klee-kai")
+
+    Usually, but not always, the AKC URL slug: "Saint Bernard" is st-bernard
+    and "Löwchen" lowchen, so prefer breed_slug() wherever a URL is known.
+    """
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def breed_slug(item):
+    """The slug keying a link ({'name', 'url'}) or breed: its own, its URL's, or its name's"""
+    if item.get('slug'):
+        return item['slug']
+    if item.get('url'):
+        return url_slug(item['url'])
+    return slugify(item['name'])
+
+
+def content_hash(values):
+    """Stable SHA-256 of a row's values, used to skip writes for unchanged breeds"""
+    payload = json.dumps(values, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def parse_range(text):
+    """(min, max) of the numbers in "12-15 years" or "9-11.5 inches", (None, None) without any
+
+    Every number counts, so "24-26 inches (male), 22-24 inches (female)" is
+    (22, 26), and text saying "up to" has no minimum.
+    """
+    if not isinstance(text, str):
+        return None, None
+    numbers = [float(number) for number in _NUMBER.findall(text)]
+    if not numbers:
+        return None, None
+    return None if _UP_TO.search(text) else min(numbers), max(numbers)
+
+
+def to_int(value):
+    """AKC sends some numbers as strings ("1936"), anything unparseable is None"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def coat_array(value):
+    """AKC reports coat selections as a list, older data as a single string; none is NULL"""
+    if not value:
+        return None
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def breed_to_row(breed_data):
+    """Flattens a breed_info dict or BreedRecord into a tuple ordered like BREED_COLUMNS"""
+    if hasattr(breed_data, 'to_row'):
+        return breed_data.to_row()
+
+    coat_type = coat_array(breed_data['coat_type'])
+    coat_length = coat_array(breed_data['coat_length'])
+
+    values = (
+        breed_slug(breed_data),
+        breed_data['name'],
+        breed_data['breed_group'],
+        breed_data['origin'],
+        breed_data['temperament'],
+        breed_data['life_expectancy'],
+        to_int(breed_data['year_recognized']),
+        to_int(breed_data['popularity']),
+    ) + tuple(
+        breed_data[column] or None  # Convert empty string to None
+        for column in TEXT_COLUMNS
+    ) + tuple(
+        breed_data['traits'][column] for column in TRAIT_COLUMNS
+    ) + (coat_type, coat_length) + parse_range(breed_data['life_expectancy']) + tuple(
+        to_float(breed_data.get(column)) for column in RANGE_COLUMNS[2:]
+    )
+
+    return values + (content_hash(values),)
@@ -0,0 +1,239 @@
+import io
+import time
+from contextlib import contextmanager
+
+from psycopg2.extras import execute_values
+
+from breed_fields import BREED_COLUMNS, breed_to_row
+from db import Database
+
+
+# Loaders NOTIFY this channel, with the table name as payload, when a commit changed rows
+CHANGES_CHANNEL = 'dog_breeds_changed'
+
+# Columns refreshed when an existing breed's content changes
+UPDATE_COLUMNS = [column for column in BREED_COLUMNS if column != 'slug']
+
+
+def upsert_query(table='dog_breeds', values=None):
+    """INSERT ... ON CONFLICT (slug) that only touches rows whose content changed.
+
+    `values` defaults to a single row of %s placeholders; pass 'VALUES %s'
+    style text for execute_values or a SELECT for staged loads. Returns one
+    row per insert or update, with a flag telling which one happened.
+    """
+    if values is None:
+        values = f"VALUES ({', '.join(['%s'] * len(BREED_COLUMNS))})"
+    assignments = ', '.join(f"{column} = EXCLUDED.{column}" for column in UPDATE_COLUMNS)
+    return f"""
+        INSERT INTO {table} AS current ({', '.join(BREED_COLUMNS)})
+        {values}
+        ON CONFLICT (slug) DO UPDATE SET
+            {assignments},
+            updated_at = CURRENT_TIMESTAMP
+        WHERE current.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        RETURNING (xmax = 0) AS inserted
+    """
+
+
+def notify_changes(cur, table='dog_breeds'):
+    """Tells LISTENing readers (see breed_api) that table changed, once the transaction commits"""
+    cur.execute("SELECT pg_notify(%s, %s)", (CHANGES_CHANNEL, table))
+
+
+def _copy_escape(value):
+    """Formats one value for COPY ... FROM STDIN in text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, list):
+        elements = []
+        for element in value:
+            if element is None:
+                elements.append('NULL')
+            else:
+                escaped = str(element).replace('\\', '\\\\').replace('"', '\\"')
+                elements.append(f'"{escaped}"')
+        value = '{' + ','.join(elements) + '}'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class BulkBreedLoader:
+    """Buffers breed rows and upserts them in batches, one transaction per batch.
+
+    method='values' uses execute_values, method='copy' streams the batch
+    through COPY FROM STDIN into a staging table first. Rows are keyed by
+    slug and only written when their content hash changed. If a batch fails
+    it is rolled back and retried row by row so a single bad breed doesn't
+    lose the rest of the batch; if there is no connection to write it with,
+    the whole batch is reported as failed and loading goes on.
+
+    conn is either a connection, used for every batch, or a Database whose
+    pool lends a connection for each batch only. An optional RunMetrics gets
+    the time spent building (and cleaning the text of) each row as 'clean'
+    and each batch write as 'db_write'.
+    """
+
+    def __init__(self, conn, batch_size=50, method='values', table='dog_breeds',
+                 on_result=None, metrics=None):
+        if method not in ('values', 'copy'):
+            raise ValueError(f"Unknown load method: {method}")
+        self.conn = conn
+        self.db = conn if isinstance(conn, Database) else None
+        if self.db:
+            self.db.prepare(f"upsert_{table}", upsert_query(table))
+        self.batch_size = batch_size
+        self.method = method
+        self.table = table
+        self.buffer = []
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = []
+        self.elapsed = 0.0
+        # Called as on_result(breed_data, error) once each breed is committed or fails
+        self.on_result = on_result
+        self.metrics = metrics
+        self._unreported = {}
+
+    @contextmanager
+    def _connection(self):
+        if self.db:
+            with self.db.connection() as conn:
+                yield conn
+        else:
+            yield self.conn
+
+    def existing_slugs(self):
+        """Returns the set of breed slugs already in the table, in one query"""
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT slug FROM {self.table}")
+            slugs = {row[0] for row in cur.fetchall()}
+            conn.commit()
+            return slugs
+
+    def add(self, breed_data):
+        """Queues a breed, flushing when the batch is full"""
+        self.buffer.append(breed_data)
+        if self.batch_size and len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def upsert(self, breed_data):
+        """Writes one breed right away, bypassing the buffer; returns whether it succeeded"""
+        failed = len(self.failed)
+        with self._connection() as conn:
+            self._upsert_one_by_one(conn, [breed_data], [breed_to_row(breed_data)])
+        return len(self.failed) == failed
+
+    def flush(self):
+        """Writes all buffered breeds, returns the number of rows written"""
+        if not self.buffer:
+            return 0
+
+        batch, self.buffer = self.buffer, []
+        # A slug can only be upserted once per statement, the latest one wins
+        by_slug = {}
+        for breed_data in batch:
+            start = time.perf_counter()
+            row = breed_to_row(breed_data)
+            if self.metrics:
+                self.metrics.record('clean', time.perf_counter() - start, row[0])
+            by_slug[row[0]] = (breed_data, row)
+        batch = [breed_data for breed_data, _ in by_slug.values()]
+        rows = [row for _, row in by_slug.values()]
+
+        start = time.perf_counter()
+        # Breeds not yet reported as committed or failed, see _report
+        self._unreported = {id(breed_data): (breed_data, row)
+                            for breed_data, row in zip(batch, rows)}
+        try:
+            self._write_batch(batch, rows)
+        except Exception as e:
+            # No connection to write with, e.g. the pool couldn't open one
+            print(f"Batch insert failed ({e}), {len(self._unreported)} breeds not written")
+            for breed_data, row in list(self._unreported.values()):
+                self.failed.append(row[1])
+                self._report(breed_data, e)
+
+        elapsed = time.perf_counter() - start
+        self.elapsed += elapsed
+        if self.metrics:
+            self.metrics.record('db_write', elapsed)
+            self.metrics.count('rows_written', len(rows))
+        return len(rows)
+
+    def _write_batch(self, batch, rows):
+        with self._connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    if self.method == 'copy':
+                        results = self._copy_rows(cur, rows)
+                    else:
+                        results = execute_values(
+                            cur, upsert_query(self.table, 'VALUES %s'), rows,
+                            page_size=max(len(rows), 1), fetch=True)
+                    if results:
+                        notify_changes(cur, self.table)
+                conn.commit()
+                self._count(results, len(rows))
+                for breed_data in batch:
+                    self._report(breed_data, None)
+            except Exception as e:
+                conn.rollback()
+                print(f"Batch insert failed ({e}), retrying {len(rows)} breeds one by one")
+                self._upsert_one_by_one(conn, batch, rows)
+
+    def close(self):
+        """Flushes whatever is left in the buffer"""
+        return self.flush()
+
+    def _report(self, breed_data, error):
+        self._unreported.pop(id(breed_data), None)
+        if self.on_result:
+            self.on_result(breed_data, error)
+
+    def _count(self, results, total):
+        inserted = sum(1 for (was_inserted,) in results if was_inserted)
+        self.inserted += inserted
+        self.updated += len(results) - inserted
+        self.unchanged += total - len(results)
+
+    def _copy_rows(self, cur, rows):
+        staging = f"{self.table}_staging"
+        columns = ', '.join(BREED_COLUMNS)
+        # Only the loaded columns: no id sequence, no generated search_vector
+        cur.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DELETE ROWS
+            AS SELECT {columns} FROM {self.table} WITH NO DATA
+        """)
+
+        data = io.StringIO()
+        for row in rows:
+            data.write('\t'.join(_copy_escape(value) for value in row))
+            data.write('\n')
+        data.seek(0)
+        cur.copy_expert(f"COPY {staging} ({columns}) FROM STDIN", data)
+
+        cur.execute(upsert_query(self.table, f"SELECT {columns} FROM {staging}"))
+        return cur.fetchall()
+
+    def _upsert_one_by_one(self, conn, batch, rows):
+        query = upsert_query(self.table)
+        for breed_data, row in zip(batch, rows):
+            try:
+                with conn.cursor() as cur:
+                    if self.db:
+                        self.db.execute_prepared(cur, f"upsert_{self.table}", row)
+                    else:
+                        cur.execute(query, row)
+                    results = cur.fetchall()
+                    if results:
+                        notify_changes(cur, self.table)
+                conn.commit()
+                self._count(results, 1)
+                self._report(breed_data, None)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error inserting {row[1]}: {e}")
+                self.failed.append(row[1])
+                self._report(breed_data, e)
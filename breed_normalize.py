@@ -0,0 +1,328 @@
+import argparse
+import json
+import time
+from datetime import date
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from breed_fields import RANGE_COLUMNS, TRAIT_COLUMNS, coat_array, parse_range
+from breed_props import extract_breed_props
+from breed_record import POPULARITY_KEY, SIZE_COLUMNS, TRAIT_SOURCE_KEYS
+from parse_stage import find_pages, read_page
+
+
+# Inclusive bounds of believable values; anything outside is reported and dropped
+BOUNDS = {
+    'year_recognized': (1875, date.today().year),
+    'popularity': (1, 1000),
+    'life_expectancy': (1, 30),
+    'height': (1, 50),
+    'weight': (1, 400),
+}
+TRAIT_BOUNDS = (1, 5)
+
+_BASICS_FIELDS = ['breed_name', 'breed_group', 'origin', 'life_expectancy', 'year_recognized']
+_DISPLAY_FIELDS = ['height_display', 'weight_display']
+
+
+def _pick(section, keys, getter):
+    """section's values for keys through getter (an itemgetter of them), None where missing"""
+    try:
+        return getter(section)
+    except KeyError:
+        return tuple(section.get(key) for key in keys)
+
+
+def raw_columns(breeds):
+    """The fields to normalize from (slug, breed_data) pairs, as {column: array of raw values}.
+
+    breed_data is the settings.breed_data section of a breedPage, as taken
+    by BreedRecord.from_breed_data. Every popularity_<year> key found in any
+    breed gets a column of its own. Each breed's dicts are read in one go
+    while they are hot in the cache, then the rows are turned into columns.
+    """
+    trait_keys = TRAIT_SOURCE_KEYS + ['coat_type', 'coat_length']
+    basics_getter = itemgetter(*_BASICS_FIELDS)
+    traits_getter = itemgetter(*trait_keys)
+    standards_fields = SIZE_COLUMNS + _DISPLAY_FIELDS
+    standards_getter = itemgetter(*standards_fields)
+
+    rows, basics = [], []
+    for slug, breed_data in breeds:
+        section = breed_data.get('basics', {}).get(slug, {})
+        basics.append(section)
+        row = (slug,) + _pick(section, _BASICS_FIELDS, basics_getter)
+
+        section = breed_data.get('traits', {}).get(slug, {})
+        traits = [trait or {} for trait in _pick(section.get('traits', {}), trait_keys,
+                                                  traits_getter)]
+        row += ((section.get('temperament'),)
+                + tuple(trait.get('score') for trait in traits[:-2])
+                + tuple(trait.get('selected') for trait in traits[-2:]))
+
+        section = breed_data.get('standards', {}).get(slug, {})
+        rows.append(row + _pick(section, standards_fields, standards_getter))
+
+    names = (['slug'] + _BASICS_FIELDS + ['temperament'] + TRAIT_COLUMNS
+             + ['coat_type', 'coat_length'] + standards_fields)
+    columns = dict(zip(names, zip(*rows))) if rows else {name: () for name in names}
+    years = sorted(key for key in set().union(*basics) if POPULARITY_KEY.match(key))
+    for key in years:
+        columns[key] = [section.get(key) for section in basics]
+    return {column: np.fromiter(values, dtype=object, count=len(rows))
+            for column, values in columns.items()}
+
+
+def _present(cells):
+    """Which raw cells were given at all: not None and not an empty string"""
+    return ~(np.equal(cells, None) | np.equal(cells, ''))
+
+
+def _to_floats(cells):
+    """An object matrix as floats, NaN where missing or not a number.
+
+    Columns that float() takes whole, the usual case, skip pd.to_numeric's
+    much slower parsing; only columns holding a bad value go through it.
+    """
+    present = _present(cells)
+    numbers = np.empty(cells.shape)
+    for i in range(cells.shape[1]):
+        try:
+            numbers[:, i] = np.where(present[:, i], cells[:, i], np.nan).astype(np.float64)
+        except (TypeError, ValueError):
+            numbers[:, i] = pd.to_numeric(cells[:, i], errors='coerce')
+    return numbers
+
+
+def _nullable(values, dtype):
+    """Whole-number floats, NaN where missing, as a pandas nullable integer array"""
+    missing = np.isnan(values)
+    return pd.arrays.IntegerArray(np.where(missing, 0, values).astype(dtype), missing)
+
+
+class NormalizedBreeds:
+    """Validated, typed columns for a batch of breeds, plus what was wrong with the input.
+
+    Takes the raw values as columns, see raw_columns() and normalize_breeds().
+
+    Checks run on a whole block of columns at once: every whole-number
+    field (trait scores, recognition year, each year's popularity ranking)
+    is parsed and range-checked as one NumPy matrix, the height and weight
+    numbers as another, and the "12-15 years" style range texts are run
+    through one regex per distinct text. A value that fails is reported in
+    `errors` (one row per slug, source field and problem) and left missing
+    in `frame` rather than guessed at. Missing values are not errors; a
+    trait score of 0 is AKC's way of leaving one out.
+
+    frame has a row per breed with nullable integer trait scores, the
+    recognition year and newest popularity ranking (and which year it is
+    from) as integers, and float32 bounds for RANGE_COLUMNS.
+    """
+
+    def __init__(self, columns):
+        self.raw = raw = columns
+        self.slugs = raw['slug']
+        self._errors = []
+
+        popularity_keys = sorted((key for key in raw if POPULARITY_KEY.match(key)), reverse=True)
+        integer_fields = TRAIT_COLUMNS + ['year_recognized'] + popularity_keys
+        integers = self._numbers(
+            integer_fields, self._cells(integer_fields),
+            [TRAIT_BOUNDS] * len(TRAIT_COLUMNS) + [BOUNDS['year_recognized']]
+            + [BOUNDS['popularity']] * len(popularity_keys),
+            whole=True, zero_is_missing=len(TRAIT_COLUMNS))
+        popularity, popularity_year = self._latest_popularity(
+            popularity_keys, integers[:, len(TRAIT_COLUMNS) + 1:])
+
+        sizes = self._numbers(SIZE_COLUMNS, self._cells(SIZE_COLUMNS),
+                              [BOUNDS[column.rsplit('_', 1)[0]] for column in SIZE_COLUMNS])
+        low, high = self._check_pairs(['height_min', 'weight_min'],
+                                      self._cells(['height_min', 'weight_min']),
+                                      sizes[:, 0::2], sizes[:, 1::2])
+        # Display text ("9-11.5 inches") only stands in when both numbers are missing
+        fallback = np.isnan(low) & np.isnan(high)
+        texts = self._cells(['life_expectancy'] + _DISPLAY_FIELDS)
+        texts[:, 1:][~fallback] = None
+        text_low, text_high = self._parse_ranges(
+            ['life_expectancy'] + _DISPLAY_FIELDS, texts,
+            [BOUNDS['life_expectancy'], BOUNDS['height'], BOUNDS['weight']])
+        low = np.where(fallback, text_low[:, 1:], low)
+        high = np.where(fallback, text_high[:, 1:], high)
+
+        columns = {
+            'slug': raw['slug'],
+            'name': np.where(_present(raw['breed_name']), raw['breed_name'], raw['slug']),
+            'breed_group': pd.Categorical(raw['breed_group']),
+            'origin': pd.Categorical(raw['origin']),
+            'temperament': raw['temperament'],
+            'life_expectancy': raw['life_expectancy'],
+            'year_recognized': _nullable(integers[:, len(TRAIT_COLUMNS)], np.int16),
+            'popularity': _nullable(popularity, np.int32),
+            'popularity_year': _nullable(popularity_year, np.int16),
+        }
+        for i, column in enumerate(TRAIT_COLUMNS):
+            columns[column] = _nullable(integers[:, i], np.uint8)
+        for column in ('coat_type', 'coat_length'):
+            columns[column] = [coat_array(value) for value in raw[column]]
+        bounds = np.column_stack([text_low[:, 0], text_high[:, 0],
+                                  low[:, 0], high[:, 0], low[:, 1], high[:, 1]])
+        for i, column in enumerate(RANGE_COLUMNS):
+            columns[column] = bounds[:, i].astype(np.float32)
+        self.frame = pd.DataFrame(columns)
+
+        self.errors = (pd.concat(self._errors, ignore_index=True) if self._errors else
+                       pd.DataFrame(columns=['slug', 'field', 'value', 'problem']))
+        del self._errors
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _cells(self, fields):
+        """The raw values of fields as a (breeds x fields) object matrix"""
+        cells = np.empty((len(self.slugs), len(fields)), dtype=object)
+        for i, field in enumerate(fields):
+            cells[:, i] = self.raw[field]
+        return cells
+
+    def _flag(self, fields, mask, cells, problems):
+        """Records cells[mask] as bad values of fields (the columns of cells).
+
+        problems is one description for all of them or one per column.
+        """
+        rows, columns = np.nonzero(mask)
+        if not len(rows):
+            return
+        if not isinstance(problems, str):
+            problems = np.asarray(problems)[columns]
+        self._errors.append(pd.DataFrame({
+            'slug': self.slugs[rows], 'field': np.asarray(fields)[columns],
+            'value': cells[rows, columns], 'problem': problems}))
+
+    def _numbers(self, fields, cells, bounds, whole=False, zero_is_missing=0):
+        """A (breeds x fields) object matrix as floats, NaN where missing or invalid.
+
+        bounds holds the inclusive (low, high) of each field; a 0 in the
+        first `zero_is_missing` columns means no value.
+        """
+        present = _present(cells)
+        numbers = _to_floats(cells)
+        self._flag(fields, present & np.isnan(numbers), cells, 'not a number')
+        numbers[:, :zero_is_missing][numbers[:, :zero_is_missing] == 0] = np.nan
+        if whole:
+            fractional = ~np.isnan(numbers) & (numbers % 1 != 0)
+            self._flag(fields, fractional, cells, 'not a whole number')
+            numbers[fractional] = np.nan
+
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 2)
+        outside = (numbers < bounds[:, 0]) | (numbers > bounds[:, 1])
+        self._flag(fields, outside, cells, [f"outside {low:g}-{high:g}" for low, high in bounds])
+        numbers[outside] = np.nan
+        return numbers
+
+    def _latest_popularity(self, keys, rankings):
+        """The newest valid ranking of each breed and its year, from columns of keys (newest first)"""
+        if not keys:
+            missing = np.full(len(self.slugs), np.nan)
+            return missing, missing
+        known = ~np.isnan(rankings)
+        newest = known.argmax(axis=1)
+        found = known.any(axis=1)
+        years = np.array([int(POPULARITY_KEY.match(key).group(1)) for key in keys])
+        return (np.where(found, rankings[np.arange(len(rankings)), newest], np.nan),
+                np.where(found, years[newest], np.nan))
+
+    def _parse_ranges(self, fields, texts, bounds):
+        """(low, high) matrices parsed from a (breeds x fields) matrix of "12-15 years" texts"""
+        present = _present(texts)
+        low = np.full(texts.shape, np.nan)
+        high = np.full(texts.shape, np.nan)
+        if present.any():
+            # Breeds share a handful of distinct texts, so each one is only parsed once
+            # (by parse_range, like the per-record path); missing texts get code -1,
+            # which picks the NaN row appended below
+            codes, uniques = pd.factorize(np.where(present, texts, None).ravel())
+            parsed = np.array([parse_range(str(text)) for text in uniques] + [(None, None)],
+                              dtype=np.float64).reshape(-1, 2)
+            low, high = (parsed[codes, i].reshape(texts.shape) for i in (0, 1))
+        self._flag(fields, present & np.isnan(low) & np.isnan(high), texts, 'no numbers')
+
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 2)
+        outside = (low < bounds[:, 0]) | (high > bounds[:, 1])
+        self._flag(fields, outside, texts, [f"outside {lowest:g}-{highest:g}"
+                                            for lowest, highest in bounds])
+        return self._check_pairs(fields, texts, np.where(outside, np.nan, low),
+                                 np.where(outside, np.nan, high))
+
+    def _check_pairs(self, fields, cells, low, high):
+        """Drops (low, high) pairs the wrong way round, reporting them as cells of fields"""
+        reversed_ = low > high
+        self._flag(fields, reversed_, cells, 'minimum above maximum')
+        low = np.where(reversed_, np.nan, low)
+        high = np.where(reversed_, np.nan, high)
+        return low, high
+
+    def error_counts(self):
+        """{field: number of invalid values}, worst field first"""
+        return self.errors['field'].value_counts().to_dict()
+
+    def missing_counts(self):
+        """{column: breeds left without a value}, invalid values included"""
+        counts = self.frame.drop(columns=['slug', 'name']).isna().sum()
+        return {column: int(count) for column, count in counts.items()}
+
+    def report(self):
+        """The per-field error report: every invalid value by source field, and missing counts"""
+        invalid = {}
+        for field, errors in self.errors.groupby('field', sort=False):
+            invalid[field] = [{'slug': slug, 'value': value, 'problem': problem}
+                              for slug, value, problem in zip(errors['slug'], errors['value'],
+                                                              errors['problem'])]
+        return {'breeds': len(self), 'invalid': invalid, 'missing': self.missing_counts()}
+
+    def summary(self):
+        counts = self.error_counts()
+        if not counts:
+            return f"Normalized {len(self)} breeds, no invalid values"
+        worst = ', '.join(f"{field} {count}" for field, count in list(counts.items())[:5])
+        return (f"Normalized {len(self)} breeds, {sum(counts.values())} invalid values "
+                f"dropped ({worst})")
+
+
+def normalize_breeds(breeds):
+    """Normalizes (slug, breed_data) pairs in one batch, see NormalizedBreeds"""
+    return NormalizedBreeds(raw_columns(breeds))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate and type the fields of saved breed pages in one batch")
+    parser.add_argument('directory', help="a page archive or a directory of saved breed pages")
+    parser.add_argument('--output', default='normalized_breeds.parquet')
+    parser.add_argument('--errors', default='normalize_errors.json',
+                        help="where to write the per-field error report")
+    args = parser.parse_args()
+
+    breeds = []
+    for slug, path in find_pages(args.directory):
+        props = extract_breed_props(read_page(path))
+        if props:
+            breeds.append((slug, props['settings']['breed_data']))
+        else:
+            print(f"No breedPage component in {path}")
+
+    start = time.perf_counter()
+    normalized = normalize_breeds(breeds)
+    elapsed = time.perf_counter() - start
+
+    normalized.frame.to_parquet(args.output, index=False)
+    with open(args.errors, 'w', encoding='utf-8') as f:
+        json.dump(normalized.report(), f, indent=2, ensure_ascii=False, default=str)
+
+    print(f"{normalized.summary()} in {elapsed * 1000:.1f} ms")
+    print(f"Saved {args.output}, error report in {args.errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+from breed_props import extract_breed_props
+from breed_record import BreedRecord
+from html_text import html_to_text
+
+
+def parse_breed_record(breed_name, html_content):
+    """Parses a breed page into a BreedRecord, raising if the page has none"""
+    # Find the data-js-props attribute that contains all the breed info
+    breed_json = extract_breed_props(html_content)
+    if not breed_json:
+        raise ValueError("no breedPage component on the page")
+
+    return BreedRecord.from_breed_data(breed_name, breed_json['settings']['breed_data'])
+
+
+def extract_breed_info(breed_name, html_content):
+    """Parses breed details out of a breed page, raising if the page has none"""
+    return parse_breed_record(breed_name, html_content).to_dict()
+
+
+def empty_breed_data(breed_name):
+    """Returns an empty breed data structure with the breed name"""
+    return {
+        "slug": breed_name,
+        "name": breed_name,
+        "breed_group": None,
+        "origin": None,
+        "temperament": None,
+        "life_expectancy": None,
+        "year_recognized": None,
+        "popularity": None,
+        "grooming": None,
+        "exercise": None,
+        "nutrition": None,
+        "health": None,
+        "training": None,
+        "traits": {
+            "adaptability": None,
+            "affectionate_with_family": None,
+            "barking_level": None,
+            "coat_grooming_frequency": None,
+            "drooling_level": None,
+            "energy_level": None,
+            "good_with_other_dogs": None,
+            "good_with_young_children": None,
+            "mental_stimulation_needs": None,
+            "openness_to_strangers": None,
+            "playfulness_level": None,
+            "shedding_level": None,
+            "trainability_level": None,
+            "watchdog_protective_nature": None
+        },
+        "coat_type": None,
+        "coat_length": None,
+        "height_min": None,
+        "height_max": None,
+        "weight_min": None,
+        "weight_max": None
+    }
+
+
+def clean_html(html_content):
+    """Removes HTML tags from content"""
+    return html_to_text(html_content)
@@ -0,0 +1,126 @@
+import html
+import json
+import re
+
+
+BREED_PAGE_COMPONENT = 'breedPage'
+
+# The breedPage div is always rendered with a double-quoted component
+# attribute, so a plain substring search is enough to jump straight to it
+_COMPONENT_RE = re.compile(
+    r'data-js-component\s*=\s*(["\']?)' + BREED_PAGE_COMPONENT + r'\1')
+
+# One attribute inside a start tag: name, optionally followed by a double
+# quoted, single quoted or unquoted value
+_ATTR_RE = re.compile(
+    r'''\s*([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?''')
+_TAG_END_RE = re.compile(r'\s*/?>')
+_TAG_NAME_RE = re.compile(r'<[a-zA-Z][^\s/>]*')
+
+
+def _parse_start_tag(text, start):
+    """Parses the start tag at text[start] without touching the rest of the page.
+
+    Returns (attrs, end) when the tag is complete, or None when the tag runs
+    past the end of the text (more data is needed).
+    """
+    name_match = _TAG_NAME_RE.match(text, start)
+    if not name_match:
+        return None
+    pos = name_match.end()
+
+    attrs = {}
+    length = len(text)
+    while pos < length:
+        end_match = _TAG_END_RE.match(text, pos)
+        if end_match:
+            return attrs, end_match.end()
+
+        attr_match = _ATTR_RE.match(text, pos)
+        if not attr_match or attr_match.end() == pos:
+            return None
+        # A quoted value that hits the end of the buffer is incomplete
+        if attr_match.end() >= length:
+            return None
+
+        name, double, single, bare = attr_match.groups()
+        value = double if double is not None else single if single is not None else bare
+        attrs[name.lower()] = html.unescape(value) if value else value
+        pos = attr_match.end()
+
+    return None
+
+
+def _find_props(text, search_from=0):
+    """Locates the breedPage div in text.
+
+    Returns a (status, value) pair where status is 'found' (value is the
+    unescaped props string), 'partial' (value is the tag start offset) or
+    'missing' (value is the offset from which a later search can resume).
+    """
+    match = _COMPONENT_RE.search(text, search_from)
+    if not match:
+        # Keep the last (possibly unfinished) tag so a marker split across
+        # chunks is still found together with its tag start
+        resume = len(text) - 64
+        last_tag = text.rfind('<', search_from)
+        if last_tag != -1:
+            resume = min(resume, last_tag)
+        return 'missing', max(search_from, resume)
+
+    tag_start = text.rfind('<', 0, match.start())
+    if tag_start == -1:
+        return 'missing', match.end()
+
+    parsed = _parse_start_tag(text, tag_start)
+    if parsed is None:
+        return 'partial', tag_start
+
+    attrs, _ = parsed
+    if attrs.get('data-js-component') != BREED_PAGE_COMPONENT or 'data-js-props' not in attrs:
+        # The marker was inside some other attribute value, keep looking
+        return _find_props(text, match.end())
+
+    return 'found', attrs['data-js-props']
+
+
+def find_breed_props(html_content):
+    """Returns the unescaped data-js-props string of the breedPage div, or None"""
+    if not html_content:
+        return None
+    status, value = _find_props(html_content)
+    return value if status == 'found' else None
+
+
+def extract_breed_props(html_content):
+    """Returns the parsed data-js-props JSON of the breedPage div, or None"""
+    props = find_breed_props(html_content)
+    if props is None:
+        return None
+    return json.loads(props)
+
+
+def extract_breed_props_from_chunks(chunks):
+    """Streaming variant of extract_breed_props.
+
+    Consumes text chunks (e.g. from response.iter_content(decode_unicode=True))
+    only until the breedPage div has been read, so the remainder of the page
+    is never downloaded or scanned.
+    """
+    buffer = ''
+    partial = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        # A partial tag can only complete once a closing '>' arrives
+        if partial and '>' not in chunk:
+            continue
+        status, value = _find_props(buffer)
+        if status == 'found':
+            return json.loads(value)
+        # Drop everything already scanned (or everything before a partial
+        # tag) and wait for more data
+        partial = status == 'partial'
+        buffer = buffer[value:]
+    return None
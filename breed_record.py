@@ -0,0 +1,219 @@
+import json
+import re
+from array import array
+
+from breed_fields import (RANGE_COLUMNS, TEXT_COLUMNS, TRAIT_COLUMNS, breed_slug, coat_array,
+                          content_hash, parse_range, to_float, to_int)
+from html_text import html_to_text
+
+
+# Key of each TRAIT_COLUMNS trait in the AKC breedPage props
+TRAIT_SOURCE_KEYS = [
+    'adaptability_level', 'affectionate_with_family', 'barking_level',
+    'coat_grooming_frequency', 'drooling_level', 'energy_level',
+    'good_with_other_dogs', 'good_with_young_children',
+    'mental_stimulation_needs', 'openness_to_strangers',
+    'playfulness_level', 'shedding_level', 'trainability_level',
+    'watchdogprotective_nature'
+]
+
+# Key of each TEXT_COLUMNS field in the AKC breedPage health section
+TEXT_SOURCE_KEYS = [f"akc_org_{column}" for column in TEXT_COLUMNS]
+
+# Height (inches) and weight (pounds) bounds, from the breedPage standards section
+SIZE_COLUMNS = RANGE_COLUMNS[2:]
+
+_NO_TRAITS = bytes(len(TRAIT_COLUMNS))
+
+# AKC adds a popularity_<year> ranking to the basics section every year
+POPULARITY_KEY = re.compile(r'popularity_(\d{4})$')
+
+
+def _trait_score(value):
+    """A 1-5 trait score as an int, anything else as 0 (missing)"""
+    try:
+        score = int(value)
+    except (TypeError, ValueError):
+        return 0
+    return score if 1 <= score <= 5 else 0
+
+
+def latest_popularity(basics):
+    """The ranking from the newest popularity_<year> key that has one, or None"""
+    years = sorted(((int(match.group(1)), key) for key in basics
+                    for match in [POPULARITY_KEY.match(key)] if match), reverse=True)
+    for _, key in years:
+        if basics[key] not in (None, ''):
+            return basics[key]
+    return None
+
+
+class BreedRecord:
+    """One breed's details in a compact, fixed layout.
+
+    Trait scores are kept in a 14-byte array with 0 for a missing score.
+    The five text fields are stored as the raw HTML fragments from the page
+    and only cleaned the first time one of them is read, so records that
+    are only deduplicated, diffed or compared by traits never pay for it.
+    """
+
+    __slots__ = ('slug', 'name', 'breed_group', 'origin', 'temperament', 'life_expectancy',
+                 'year_recognized', 'popularity', 'coat_type', 'coat_length',
+                 'height_min', 'height_max', 'weight_min', 'weight_max',
+                 '_scores', '_html', '_text')
+
+    def __init__(self, slug, name=None, breed_group=None, origin=None, temperament=None,
+                 life_expectancy=None, year_recognized=None, popularity=None,
+                 scores=_NO_TRAITS, coat_type=None, coat_length=None, sizes=(None,) * 4,
+                 html=None, text=None):
+        self.slug = slug
+        self.name = name or slug
+        self.breed_group = breed_group
+        self.origin = origin
+        self.temperament = temperament
+        self.life_expectancy = life_expectancy
+        self.year_recognized = year_recognized
+        self.popularity = popularity
+        self.coat_type = coat_type
+        self.coat_length = coat_length
+        self.height_min, self.height_max, self.weight_min, self.weight_max = sizes
+        self._scores = array('B', scores)
+        # Either raw HTML fragments still to be cleaned, or the cleaned text
+        self._html = html
+        self._text = text if html is None else None
+        if html is None and text is None:
+            self._text = (None,) * len(TEXT_COLUMNS)
+
+    @classmethod
+    def from_breed_data(cls, breed_name, breed_data):
+        """Builds a record from the settings.breed_data section of a breedPage"""
+        basics = breed_data.get('basics', {}).get(breed_name, {})
+        traits = breed_data.get('traits', {}).get(breed_name, {})
+        trait_scores = traits.get('traits', {})
+        health = breed_data.get('health', {}).get(breed_name, {})
+        standards = breed_data.get('standards', {}).get(breed_name, {})
+
+        sizes = [to_float(standards.get(column)) for column in SIZE_COLUMNS]
+        # Fall back to the display text when the numeric fields are missing
+        for offset, display in ((0, 'height_display'), (2, 'weight_display')):
+            if sizes[offset] is None and sizes[offset + 1] is None:
+                sizes[offset:offset + 2] = parse_range(standards.get(display))
+
+        return cls(
+            breed_name,
+            name=basics.get('breed_name', breed_name),
+            breed_group=basics.get('breed_group'),
+            origin=basics.get('origin'),
+            temperament=traits.get('temperament'),
+            life_expectancy=basics.get('life_expectancy'),
+            year_recognized=basics.get('year_recognized'),
+            popularity=latest_popularity(basics),
+            scores=[_trait_score(trait_scores.get(key, {}).get('score'))
+                    for key in TRAIT_SOURCE_KEYS],
+            coat_type=trait_scores.get('coat_type', {}).get('selected') or None,
+            coat_length=trait_scores.get('coat_length', {}).get('selected') or None,
+            sizes=sizes,
+            html=tuple(health.get(key, '') for key in TEXT_SOURCE_KEYS))
+
+    @classmethod
+    def from_dict(cls, breed_info):
+        """Builds a record from a breed_info dict as saved in JSON exports"""
+        traits = breed_info.get('traits') or {}
+        return cls(
+            breed_slug(breed_info),
+            name=breed_info.get('name'),
+            breed_group=breed_info.get('breed_group'),
+            origin=breed_info.get('origin'),
+            temperament=breed_info.get('temperament'),
+            life_expectancy=breed_info.get('life_expectancy'),
+            year_recognized=breed_info.get('year_recognized'),
+            popularity=breed_info.get('popularity'),
+            scores=[_trait_score(traits.get(column)) for column in TRAIT_COLUMNS],
+            coat_type=breed_info.get('coat_type'),
+            coat_length=breed_info.get('coat_length'),
+            sizes=[to_float(breed_info.get(column)) for column in SIZE_COLUMNS],
+            text=tuple(breed_info.get(column) for column in TEXT_COLUMNS))
+
+    @property
+    def text(self):
+        """The cleaned text fields, in TEXT_COLUMNS order"""
+        if self._text is None:
+            self._text = tuple(html_to_text(fragment) for fragment in self._html)
+            self._html = None
+        return self._text
+
+    @property
+    def grooming(self):
+        return self.text[0]
+
+    @property
+    def exercise(self):
+        return self.text[1]
+
+    @property
+    def nutrition(self):
+        return self.text[2]
+
+    @property
+    def health(self):
+        return self.text[3]
+
+    @property
+    def training(self):
+        return self.text[4]
+
+    @property
+    def scores(self):
+        """Trait scores in TRAIT_COLUMNS order, 0 where the score is missing"""
+        return self._scores
+
+    def trait(self, column):
+        score = self._scores[TRAIT_COLUMNS.index(column)]
+        return score or None
+
+    @property
+    def traits(self):
+        return {column: score or None for column, score in zip(TRAIT_COLUMNS, self._scores)}
+
+    def to_row(self):
+        """The dog_breeds row, ordered like BREED_COLUMNS"""
+        values = (
+            self.slug, self.name, self.breed_group, self.origin, self.temperament,
+            self.life_expectancy, to_int(self.year_recognized), to_int(self.popularity)
+        ) + tuple(
+            value or None for value in self.text
+        ) + tuple(
+            score or None for score in self._scores
+        ) + (
+            coat_array(self.coat_type), coat_array(self.coat_length)
+        ) + parse_range(self.life_expectancy) + (
+            self.height_min, self.height_max, self.weight_min, self.weight_max
+        )
+
+        return values + (content_hash(values),)
+
+    def to_dict(self):
+        """The breed_info dict layout used by the JSON exports"""
+        breed_info = {
+            'slug': self.slug,
+            'name': self.name,
+            'breed_group': self.breed_group,
+            'origin': self.origin,
+            'temperament': self.temperament,
+            'life_expectancy': self.life_expectancy,
+            'year_recognized': self.year_recognized,
+            'popularity': self.popularity,
+        }
+        breed_info.update(zip(TEXT_COLUMNS, self.text))
+        breed_info['traits'] = self.traits
+        breed_info['coat_type'] = self.coat_type
+        breed_info['coat_length'] = self.coat_length
+        breed_info.update(zip(SIZE_COLUMNS, (self.height_min, self.height_max,
+                                             self.weight_min, self.weight_max)))
+        return breed_info
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def __repr__(self):
+        return f"BreedRecord({self.slug!r})"
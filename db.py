@@ -0,0 +1,150 @@
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.pool import ThreadedConnectionPool
+
+
+def db_params(**overrides):
+    """Connection parameters from the environment / .env, with explicit overrides"""
+    load_dotenv()
+    params = {
+        'dbname': os.getenv('DB_NAME', 'dog_breeds_db'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': os.getenv('DB_PORT', '5432')
+    }
+    params.update(overrides)
+    return params
+
+
+def connect(**overrides):
+    """A single connection configured from .env"""
+    return psycopg2.connect(**db_params(**overrides))
+
+
+def _numbered_params(sql):
+    """Rewrites %s placeholders as $1, $2, ... for PREPARE"""
+    counter = iter(range(1, sql.count('%s') + 1))
+    return re.sub(r'%s', lambda _: f"${next(counter)}", sql)
+
+
+class Database:
+    """Thread-safe pool of connections configured from .env.
+
+    connection() borrows a connection and blocks while all maxconn are in
+    use instead of failing. The pool closes connections returned beyond
+    minconn, so minconn defaults to maxconn to keep them (and the statements
+    prepared on them) open; transaction() wraps one in commit/rollback.
+    Statements registered with prepare() are PREPAREd once per pooled
+    connection and then run with EXECUTE. stats() reports how many
+    connections are open and how long callers waited for one.
+    """
+
+    def __init__(self, maxconn=4, minconn=None, **overrides):
+        self.params = db_params(**overrides)
+        self.pool = ThreadedConnectionPool(
+            maxconn if minconn is None else minconn, maxconn, **self.params)
+        self.maxconn = maxconn
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.lock = threading.Lock()
+        self.statements = {}
+        # Connection -> names of the statements prepared on it
+        self.prepared = {}
+
+        self.acquired = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+
+    @contextmanager
+    def connection(self):
+        """Borrows a pooled connection for the duration of the block"""
+        start = time.perf_counter()
+        self.slots.acquire()
+        try:
+            conn = self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+        waited = time.perf_counter() - start
+        with self.lock:
+            self.acquired += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.wait_seconds += waited
+            self.max_wait = max(self.max_wait, waited)
+
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            if not broken and not conn.closed and \
+                    conn.status != psycopg2.extensions.STATUS_READY:
+                # Don't hand the next borrower a transaction left open
+                conn.rollback()
+            self.pool.putconn(conn, close=broken or bool(conn.closed))
+            if conn.closed:
+                self.prepared.pop(conn, None)
+            with self.lock:
+                self.in_use -= 1
+            self.slots.release()
+
+    @contextmanager
+    def transaction(self):
+        """A cursor on a pooled connection, committed on success and rolled back on error"""
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    yield cur
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def prepare(self, name, sql):
+        """Registers a %s-style statement to be run through execute_prepared()"""
+        self.statements[name] = _numbered_params(sql)
+
+    def execute_prepared(self, cur, name, params=()):
+        """Runs a registered statement, PREPAREing it first on this connection if needed"""
+        conn = cur.connection
+        prepared = self.prepared.setdefault(conn, set())
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} AS {self.statements[name]}")
+            prepared.add(name)
+        if params:
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
+
+    def stats(self):
+        """Pool metrics: open connections, borrowers, and time spent waiting"""
+        with self.lock:
+            return {
+                'open': len(self.pool._pool) + len(self.pool._used),
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'max': self.maxconn,
+                'acquired': self.acquired,
+                'wait_seconds': round(self.wait_seconds, 4),
+                'max_wait_seconds': round(self.max_wait, 4)
+            }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"DB pool: {stats['acquired']} checkouts, {stats['open']} of {stats['max']} "
+                f"connections open (peak {stats['peak_in_use']} in use), "
+                f"{stats['wait_seconds']:.2f}s waiting")
+
+    def close(self):
+        self.pool.closeall()
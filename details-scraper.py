@@ -6,14 +6,15 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 import json
-import time
+from driver_pool import DriverPool, wait_until_ready
 
 
 class DetailsScraper:
-    def __init__(self):
+    def __init__(self, pool_size=2, max_pages=50, headless=True):
         # Setup Chrome options similar to the working breed scraper
         self.chrome_options = Options()
-        # self.chrome_options.add_argument('--headless')  # Comment out for debugging
+        if headless:  # Pass headless=False for debugging
+            self.chrome_options.add_argument('--headless=new')
         self.chrome_options.add_argument('--window-size=1920,1080')
         self.chrome_options.add_argument('--disable-gpu')
         self.chrome_options.add_argument('--no-sandbox')
@@ -25,115 +26,125 @@ class DetailsScraper:
         # Setup Chrome service
         self.service = Service(ChromeDriverManager().install())
 
-    def get_breed_details(self, url="https://www.akc.org/dog-breeds/affenpinscher/"):
-        driver = webdriver.Chrome(
-            service=self.service, options=self.chrome_options)
-        wait = WebDriverWait(driver, 20)
+        # Warm browsers shared by every get_breed_details call
+        self.pool = DriverPool(
+            lambda: webdriver.Chrome(service=self.service, options=self.chrome_options),
+            size=pool_size, max_pages=max_pages)
+
+    def close(self):
+        """Quits the pooled browsers"""
+        self.pool.close()
 
+    def get_breed_details(self, url="https://www.akc.org/dog-breeds/affenpinscher/"):
         try:
-            print(f"Accessing URL: {url}")
-            driver.get(url)
-            time.sleep(5)  # Increased initial wait time
-
-            # Debug: Print page title
-            print(f"Page title: {driver.title}")
-
-            breed_data = {
-                "breed_name": None,
-                "description": None,
-                "characteristics": {},
-                "vital_stats": {}
-            }
-
-            try:
-                # Get breed name (this works already)
-                breed_name = wait.until(
-                    EC.presence_of_element_located((By.TAG_NAME, "h1"))
-                )
-                breed_data["breed_name"] = breed_name.text.strip()
-                print(f"Found breed name: {breed_data['breed_name']}")
-
-                # Get description - updated selector
+            with self.pool.driver() as driver:
+                wait = WebDriverWait(driver, 20)
+
+                print(f"Accessing URL: {url}")
+                driver.get(url)
+                # Wait for the page to be usable instead of a fixed sleep
+                wait_until_ready(driver)
+
+                # Debug: Print page title
+                print(f"Page title: {driver.title}")
+
+                breed_data = {
+                    "breed_name": None,
+                    "description": None,
+                    "characteristics": {},
+                    "vital_stats": {}
+                }
+
                 try:
-                    description = wait.until(
-                        EC.presence_of_element_located(
-                            (By.CSS_SELECTOR, "div.breed-hero__footer"))
+                    # Get breed name (this works already)
+                    breed_name = wait.until(
+                        EC.presence_of_element_located((By.TAG_NAME, "h1"))
                     )
-                    breed_data["description"] = description.text.strip()
-                    print(f"Found description: {description.text[:50]}...")
-                except Exception as e:
-                    print(f"Error getting description: {e}")
-                    # Try alternative selector
+                    breed_data["breed_name"] = breed_name.text.strip()
+                    print(f"Found breed name: {breed_data['breed_name']}")
+
+                    # Get description - updated selector
                     try:
-                        description = driver.find_element(
-                            By.CSS_SELECTOR, "div.breed-description")
+                        description = wait.until(
+                            EC.presence_of_element_located(
+                                (By.CSS_SELECTOR, "div.breed-hero__footer"))
+                        )
                         breed_data["description"] = description.text.strip()
-                        print(
-                            f"Found description (alternative): {description.text[:50]}...")
-                    except:
-                        pass
-
-                # Get characteristics - updated selector
-                try:
-                    characteristics = driver.find_elements(
-                        By.CSS_SELECTOR, "div.breed-characteristics-ratings-item"
-                    )
-                    for char in characteristics:
+                        print(f"Found description: {description.text[:50]}...")
+                    except Exception as e:
+                        print(f"Error getting description: {e}")
+                        # Try alternative selector
                         try:
-                            name = char.find_element(
-                                By.CSS_SELECTOR, ".breed-characteristics-ratings-name"
-                            ).text.strip()
-                            stars = len(char.find_elements(
-                                By.CSS_SELECTOR, ".icon-full-star"
-                            ))
-                            breed_data["characteristics"][name] = stars
-                            print(f"Found characteristic: {name} = {stars}")
-                        except Exception as e:
-                            print(f"Error processing characteristic: {e}")
-                except Exception as e:
-                    print(f"Error getting characteristics section: {e}")
+                            description = driver.find_element(
+                                By.CSS_SELECTOR, "div.breed-description")
+                            breed_data["description"] = description.text.strip()
+                            print(
+                                f"Found description (alternative): {description.text[:50]}...")
+                        except:
+                            pass
+
+                    # Get characteristics - updated selector
+                    try:
+                        characteristics = driver.find_elements(
+                            By.CSS_SELECTOR, "div.breed-characteristics-ratings-item"
+                        )
+                        for char in characteristics:
+                            try:
+                                name = char.find_element(
+                                    By.CSS_SELECTOR, ".breed-characteristics-ratings-name"
+                                ).text.strip()
+                                stars = len(char.find_elements(
+                                    By.CSS_SELECTOR, ".icon-full-star"
+                                ))
+                                breed_data["characteristics"][name] = stars
+                                print(f"Found characteristic: {name} = {stars}")
+                            except Exception as e:
+                                print(f"Error processing characteristic: {e}")
+                    except Exception as e:
+                        print(f"Error getting characteristics section: {e}")
+
+                    # Get vital stats - updated selector
+                    try:
+                        vital_stats = driver.find_elements(
+                            By.CSS_SELECTOR, "div.vital-stat"
+                        )
+                        for stat in vital_stats:
+                            try:
+                                key = stat.find_element(
+                                    By.CSS_SELECTOR, ".vital-stat-key"
+                                ).text.strip()
+                                value = stat.find_element(
+                                    By.CSS_SELECTOR, ".vital-stat-value"
+                                ).text.strip()
+                                breed_data["vital_stats"][key] = value
+                                print(f"Found vital stat: {key} = {value}")
+                            except Exception as e:
+                                print(f"Error processing vital stat: {e}")
+                    except Exception as e:
+                        print(f"Error getting vital stats section: {e}")
+
+                    # Debug: Save page source if we didn't get all data
+                    if not breed_data["description"] or not breed_data["characteristics"] or not breed_data["vital_stats"]:
+                        with open('page_source.html', 'w', encoding='utf-8') as f:
+                            f.write(driver.page_source)
+                        print("Page source saved to page_source.html for debugging")
 
-                # Get vital stats - updated selector
-                try:
-                    vital_stats = driver.find_elements(
-                        By.CSS_SELECTOR, "div.vital-stat"
-                    )
-                    for stat in vital_stats:
-                        try:
-                            key = stat.find_element(
-                                By.CSS_SELECTOR, ".vital-stat-key"
-                            ).text.strip()
-                            value = stat.find_element(
-                                By.CSS_SELECTOR, ".vital-stat-value"
-                            ).text.strip()
-                            breed_data["vital_stats"][key] = value
-                            print(f"Found vital stat: {key} = {value}")
-                        except Exception as e:
-                            print(f"Error processing vital stat: {e}")
                 except Exception as e:
-                    print(f"Error getting vital stats section: {e}")
-
-                # Debug: Save page source if we didn't get all data
-                if not breed_data["description"] or not breed_data["characteristics"] or not breed_data["vital_stats"]:
-                    with open('page_source.html', 'w', encoding='utf-8') as f:
-                        f.write(driver.page_source)
-                    print("Page source saved to page_source.html for debugging")
-
-            except Exception as e:
-                print(f"Error processing breed data: {e}")
+                    print(f"Error processing breed data: {e}")
 
-            return breed_data
+                return breed_data
 
         except Exception as e:
             print(f"Error in get_breed_details: {e}")
             return None
-        finally:
-            driver.quit()
 
 
 def main():
     scraper = DetailsScraper()
-    breed_data = scraper.get_breed_details()
+    try:
+        breed_data = scraper.get_breed_details()
+    finally:
+        scraper.close()
 
     if breed_data:
         print("\nSuccessfully scraped breed data:")
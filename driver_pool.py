@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchWindowException,
+                                        WebDriverException)
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+
+# What chromedriver says when the browser behind a session is gone
+_LOST_SESSION_MESSAGES = ('invalid session id', 'session deleted', 'chrome not reachable',
+                          'disconnected', 'tab crashed', 'target window already closed')
+
+
+def _session_lost(error):
+    """Whether a WebDriverException means the browser is gone, not just that a page misbehaved"""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    message = (error.msg or '').lower()
+    return any(text in message for text in _LOST_SESSION_MESSAGES)
+
+
+class DriverPool:
+    """Keeps up to `size` WebDrivers warm and hands them out to workers.
+
+    Drivers are started lazily by `driver_factory`, reset between pages,
+    and quit and replaced after `max_pages` pages or when their session is
+    lost, so a worker pays for browser startup only once every `max_pages`
+    pages. A page that times out or otherwise fails keeps its driver.
+    """
+
+    def __init__(self, driver_factory, size=2, max_pages=50):
+        self.driver_factory = driver_factory
+        self.size = max(1, int(size))
+        self.max_pages = max_pages
+
+        # Guards idle and started; notified whenever a driver comes back or a slot frees up
+        self.available = threading.Condition()
+        self.idle = []
+        self.started = 0
+        self.page_counts = {}
+        self.closed = False
+
+    def _checkout(self, timeout):
+        # Reuse an idle driver if there is one, start a new one if the pool
+        # isn't full yet, otherwise wait until a driver is given back or a
+        # crashed one frees its slot. Raises queue.Empty after `timeout` seconds.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.available:
+            while not self.idle and self.started >= self.size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self.available.wait(remaining)
+            if self.idle:
+                return self.idle.pop()
+            self.started += 1
+
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self.available:
+                self.started -= 1
+                self.available.notify()
+            raise
+        self.page_counts[id(driver)] = 0
+        return driver
+
+    def _checkin(self, driver):
+        with self.available:
+            self.idle.append(driver)
+            self.available.notify()
+
+    def _retire(self, driver):
+        with self.available:
+            self.started -= 1
+            self.page_counts.pop(id(driver), None)
+            # A waiter can start the replacement itself
+            self.available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _reset(self, driver):
+        """Clears cookies and storage so the next page starts clean"""
+        driver.delete_all_cookies()
+        try:
+            driver.execute_script(
+                "window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            # Storage isn't accessible on some pages (e.g. about:blank)
+            pass
+        driver.get('about:blank')
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager lending a driver: `with pool.driver() as driver:`"""
+        if self.closed:
+            raise RuntimeError("DriverPool is closed")
+
+        driver = self._checkout(timeout)
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException as e:
+            # A crashed browser isn't handed out again; a slow page doesn't cost a browser
+            healthy = not _session_lost(e)
+            raise
+        finally:
+            self.page_counts[id(driver)] = self.page_counts.get(id(driver), 0) + 1
+            if healthy and not self.closed and self.page_counts[id(driver)] < self.max_pages:
+                try:
+                    self._reset(driver)
+                    self._checkin(driver)
+                except Exception:
+                    self._retire(driver)
+            else:
+                self._retire(driver)
+
+    def close(self):
+        """Quits every idle driver; drivers still lent out are quit on return"""
+        self.closed = True
+        with self.available:
+            idle, self.idle = self.idle, []
+        for driver in idle:
+            self._retire(driver)
+
+
+def wait_until_ready(driver, locator=None, timeout=20):
+    """Waits for the document to finish loading and `locator` (if given) to be present.
+
+    Replaces fixed sleeps after driver.get(): returns as soon as the page is
+    usable and raises TimeoutException if it never gets there.
+    """
+    wait = WebDriverWait(driver, timeout)
+    wait.until(lambda d: d.execute_script("return document.readyState") == 'complete')
+    if locator:
+        return wait.until(EC.presence_of_element_located(locator))
+    return None
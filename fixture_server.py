@@ -0,0 +1,170 @@
+import argparse
+import hashlib
+import html
+import os
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from record_stream import read_records
+from snapshot_diff import snapshot_paths
+
+
+FIXTURE_BREED = 'affenpinscher'
+BREED_PATH_RE = re.compile(r'^/dog-breeds/([a-z0-9-]+)/?$')
+LISTING_PATH_RE = re.compile(r'^/dog-breeds/(?:page/(\d+)/)?$')
+LISTING_PAGE_SIZE = 12
+
+
+def render_listing(breeds, letter, page):
+    """Renders one page of the A-Z listing with the same grid markup as akc.org.
+
+    Returns None for a page past the last one, which akc.org answers with a 404.
+    """
+    matching = [breed for breed in breeds if breed['name'][:1].upper() == letter]
+    start = (page - 1) * LISTING_PAGE_SIZE
+    if page > 1 and start >= len(matching):
+        return None
+    cards = ''.join(
+        f'<div class="grid-col"><a href="/dog-breeds/{breed["slug"]}/">'
+        f'{html.escape(breed["name"])}</a></div>'
+        for breed in matching[start:start + LISTING_PAGE_SIZE])
+    return f'<html><body><div class="breed-card-type-grid">{cards}</div></body></html>'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the saved breed page for every /dog-breeds/<slug>/ request.
+
+    The fixture's own slug and breed name are rewritten to the requested
+    ones so each breed parses as if it had its own page. The A-Z listing
+    pages are rendered from the breeds of the latest output/ link file, with
+    a 404 past the last page of a letter.
+    With a rate limit, requests beyond it within a second get a 429 with
+    Retry-After, like a site shedding load.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.server.rate_limit and not self._admit():
+            self._send(429, b'Too many requests', headers={'Retry-After': '1'})
+            return
+
+        parts = urlsplit(self.path)
+        listing = LISTING_PATH_RE.match(parts.path)
+        if listing:
+            letter = parse_qs(parts.query).get('letter', ['A'])[0].upper()
+            page = int(listing.group(1) or 1)
+            body = render_listing(self.server.breeds, letter, page)
+            if body is None:
+                self._send(404, b'Not found')
+            else:
+                self._send(200, body.encode('utf-8'), 'text/html; charset=utf-8')
+            return
+
+        match = BREED_PATH_RE.match(parts.path)
+        if not match:
+            self._send(404, b'Not found')
+            return
+
+        slug = match.group(1)
+        display_name = slug.replace('-', ' ').title()
+        body = (self.server.fixture
+                .replace(FIXTURE_BREED, slug)
+                .replace(FIXTURE_BREED.title(), display_name)
+                .encode('utf-8'))
+
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', headers={'ETag': etag})
+            return
+        self._send(200, body, 'text/html; charset=utf-8', headers={'ETag': etag})
+
+    def _admit(self):
+        """Whether this request fits in the rate limit of the last second"""
+        now = time.monotonic()
+        with self.server.lock:
+            recent = self.server.recent
+            while recent and recent[0] <= now - 1:
+                recent.popleft()
+            if len(recent) >= self.server.rate_limit:
+                self.server.throttled += 1
+                return False
+            recent.append(now)
+            return True
+
+    def _send(self, status, body, content_type='text/plain', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def load_listing_breeds(output_dir='output'):
+    """Breeds (name and slug) from the newest link file, for the listing pages"""
+    snapshots = snapshot_paths(output_dir)
+    if not snapshots:
+        return []
+    return [{'name': breed['name'], 'slug': breed['url'].rstrip('/').split('/')[-1]}
+            for breed in read_records(snapshots[-1])]
+
+
+def start_fixture_server(fixture='example.html', host='127.0.0.1', port=0, verbose=False,
+                         output_dir='output', rate_limit=None):
+    """Starts the stand-in server on a background thread and returns it.
+
+    The base URL to scrape is f"http://{host}:{server.server_port}/dog-breeds/".
+    rate_limit caps requests per second, server.throttled counts the
+    requests turned away. Call server.shutdown() when done.
+    """
+    with open(fixture, 'r', encoding='utf-8') as f:
+        page = f.read()
+
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.fixture = page
+    server.breeds = load_listing_breeds(output_dir)
+    server.verbose = verbose
+    server.rate_limit = rate_limit
+    server.lock = threading.Lock()
+    server.recent = deque()
+    server.throttled = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve saved AKC pages locally as a stand-in for akc.org")
+    parser.add_argument('--fixture', default='example.html')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--rate-limit', type=int,
+                        help="answer requests beyond this many per second with 429")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.fixture):
+        print(f"Fixture {args.fixture} not found")
+        return
+
+    server = start_fixture_server(args.fixture, args.host, args.port, verbose=True,
+                                  rate_limit=args.rate_limit)
+    print(f"Serving {args.fixture} at http://{args.host}:{server.server_port}/dog-breeds/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import re
+from html import unescape
+
+
+# Markup that html.parser drops from the text: comments, doctypes and
+# processing instructions, and tags (a '<' not followed by a tag name is text).
+# CDATA sections are markup too, but their contents are text.
+_MARKUP = re.compile(
+    r'<!\[CDATA\[(?P<cdata>.*?)\]\]>|<!--.*?-->|<[!?][^>]*>'
+    r'|<(?P<close>/?)(?P<tag>[A-Za-z][^\s/>]*)(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.S)
+
+# Elements whose contents html.parser keeps but get_text() leaves out
+_RAW_TEXT = re.compile(r'<(script|style|template)\b[^>]*>.*?(?:</\1\s*>|$)', re.S | re.I)
+
+# Elements whose whitespace-only text BeautifulSoup keeps as it is
+_PRESERVE_WHITESPACE = frozenset(['pre', 'textarea'])
+_ASCII_SPACES = ' \t\n\r\f'
+
+_BREAK = re.compile(r'<br\b[^>]*>', re.I)
+_BLOCK_END = re.compile(r'</(?:p|div|li|h[1-6]|ul|ol|blockquote)\s*>', re.I)
+_BLANK_LINES = re.compile(r'[ \t]*\n\s*\n\s*')
+
+
+def _unescape(run):
+    return unescape(run) if '&' in run else run
+
+
+def _collapse(run):
+    """BeautifulSoup keeps a text node of nothing but ASCII whitespace as one newline or space"""
+    if run.strip(_ASCII_SPACES):
+        return run
+    return '\n' if '\n' in run else ' '
+
+
+def html_to_text(html_content, paragraphs=False):
+    """Text of an HTML fragment, the same as BeautifulSoup's get_text().strip().
+
+    With paragraphs=True, paragraphs and other blocks are separated by a blank
+    line and <br> becomes a newline instead of running the text together.
+    """
+    if not html_content:
+        return ""
+    if '<' not in html_content:
+        return unescape(html_content).strip() if '&' in html_content else html_content.strip()
+
+    # An empty comment in place of a script still separates the text around it
+    text = _RAW_TEXT.sub('<!---->', html_content)
+    if paragraphs:
+        text = _BREAK.sub('\n', text)
+        text = _BLOCK_END.sub('\n\n', text)
+
+    # Each run of text between two pieces of markup is one text node to soup,
+    # paired with whether it is inside a <pre> or <textarea>
+    runs = []
+    preserve = 0
+    start = 0
+    for match in _MARKUP.finditer(text):
+        runs.append((_unescape(text[start:match.start()]), preserve))
+        if match.group('cdata'):
+            runs.append((match.group('cdata'), preserve))
+        tag = match.group('tag')
+        if tag and tag.lower() in _PRESERVE_WHITESPACE:
+            preserve = max(0, preserve - 1 if match.group('close') else preserve + 1)
+        start = match.end()
+    runs.append((_unescape(text[start:]), preserve))
+
+    text = ''.join(run if paragraphs or preserved else _collapse(run)
+                   for run, preserved in runs if run)
+    if paragraphs:
+        text = _BLANK_LINES.sub('\n\n', text)
+    return text.strip()
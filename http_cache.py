@@ -0,0 +1,165 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class HttpCache:
+    """On-disk conditional-GET cache for page bodies.
+
+    Bodies are stored gzip-compressed under a hash of their URL next to a
+    small JSON metadata file holding the validators (ETag/Last-Modified).
+    Cached URLs are revalidated with If-None-Match/If-Modified-Since and a
+    304 is answered from disk. Once the cache grows past max_bytes the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir='.http_cache', max_bytes=500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        # key -> [size on disk, last used], rebuilt from the metadata files
+        self.index = {}
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.json'):
+                key = filename[:-5]
+                meta = self._read_meta(key)
+                if meta:
+                    self.index[key] = [meta['stored_bytes'], meta.get('last_used', 0)]
+        self.total_bytes = sum(size for size, _ in self.index.values())
+        if self.total_bytes > self.max_bytes:
+            self._evict_lru()
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _read_meta(self, key):
+        try:
+            with open(self._path(key, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read_body(self, key):
+        with gzip.open(self._path(key, '.gz'), 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def get(self, session, url, **kwargs):
+        """GETs url through the cache and returns the page text.
+
+        Raises requests.HTTPError for error responses, like raise_for_status.
+        """
+        key = self._key(url)
+        meta = self._read_meta(key) if key in self.index else None
+
+        request_headers = kwargs.pop('headers', None)
+        headers = dict(request_headers or {})
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and meta:
+            try:
+                text = self._read_body(key)
+            except OSError:
+                # Body went missing under us, fetch it again unconditionally
+                self._evict(key)
+                return self.get(session, url, headers=request_headers, **kwargs)
+            meta['last_used'] = time.time()
+            self._write_atomic(self._path(key, '.json'), json.dumps(meta).encode('utf-8'))
+            with self.lock:
+                self.hits += 1
+                self.bytes_saved += meta['body_bytes']
+                self.index[key][1] = meta['last_used']
+            return text
+
+        response.raise_for_status()
+        text = response.text
+        with self.lock:
+            self.misses += 1
+
+        if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+            self._store(key, url, response, text)
+        return text
+
+    def _store(self, key, url, response, text):
+        body = text.encode('utf-8')
+        compressed = gzip.compress(body)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_bytes': len(body),
+            'stored_bytes': len(compressed),
+            'last_used': time.time()
+        }
+        self._write_atomic(self._path(key, '.gz'), compressed)
+        self._write_atomic(self._path(key, '.json'), json.dumps(meta).encode('utf-8'))
+
+        with self.lock:
+            previous = self.index.get(key)
+            if previous:
+                self.total_bytes -= previous[0]
+            self.index[key] = [len(compressed), meta['last_used']]
+            self.total_bytes += len(compressed)
+            overflow = self.total_bytes > self.max_bytes
+        if overflow:
+            self._evict_lru()
+
+    def _evict(self, key):
+        for suffix in ('.json', '.gz'):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+        with self.lock:
+            entry = self.index.pop(key, None)
+            if entry:
+                self.total_bytes -= entry[0]
+
+    def _evict_lru(self):
+        """Drops least recently used entries until the cache fits max_bytes"""
+        with self.lock:
+            by_age = sorted(self.index.items(), key=lambda item: item[1][1])
+        for key, _ in by_age:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._evict(key)
+
+    def stats(self):
+        """Hit/miss counters for reporting"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bytes_saved': self.bytes_saved,
+                'entries': len(self.index),
+                'stored_bytes': self.total_bytes
+            }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"HTTP cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['bytes_saved'] / (1024 * 1024):.1f} MB not re-downloaded, "
+                f"{stats['entries']} entries ({stats['stored_bytes'] / (1024 * 1024):.1f} MB on disk)")
@@ -1,22 +1,14 @@
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import os
-from dotenv import load_dotenv
+from db import db_params
+from migrations import migrate
 
 
 class DatabaseInitializer:
     def __init__(self):
-        # Load environment variables from .env file
-        load_dotenv()
-
-        # Database connection parameters
-        self.db_params = {
-            'dbname': os.getenv('DB_NAME', 'dog_breeds_db'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', ''),
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': os.getenv('DB_PORT', '5432')
-        }
+        # Database connection parameters from the .env file
+        self.db_params = db_params()
 
         self.conn = None
         self.cur = None
@@ -64,66 +56,12 @@ class DatabaseInitializer:
             raise e
 
     def create_tables(self):
-        """Create the necessary tables"""
-        try:
-            # Create dog_breeds table
-            self.cur.execute("""
-                CREATE TABLE IF NOT EXISTS dog_breeds (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    breed_group VARCHAR(50),
-                    origin VARCHAR(50),
-                    temperament TEXT,
-                    life_expectancy VARCHAR(20),
-                    year_recognized INTEGER,
-                    popularity INTEGER,
-                    
-                    -- Detailed Information
-                    grooming TEXT,
-                    exercise TEXT,
-                    nutrition TEXT,
-                    health TEXT,
-                    training TEXT,
-                    
-                    -- Traits (1-5 scale)
-                    adaptability INTEGER CHECK (adaptability BETWEEN 1 AND 5),
-                    affectionate_with_family INTEGER CHECK (affectionate_with_family BETWEEN 1 AND 5),
-                    barking_level INTEGER CHECK (barking_level BETWEEN 1 AND 5),
-                    coat_grooming_frequency INTEGER CHECK (coat_grooming_frequency BETWEEN 1 AND 5),
-                    drooling_level INTEGER CHECK (drooling_level BETWEEN 1 AND 5),
-                    energy_level INTEGER CHECK (energy_level BETWEEN 1 AND 5),
-                    good_with_other_dogs INTEGER CHECK (good_with_other_dogs BETWEEN 1 AND 5),
-                    good_with_young_children INTEGER CHECK (good_with_young_children BETWEEN 1 AND 5),
-                    mental_stimulation_needs INTEGER CHECK (mental_stimulation_needs BETWEEN 1 AND 5),
-                    openness_to_strangers INTEGER CHECK (openness_to_strangers BETWEEN 1 AND 5),
-                    playfulness_level INTEGER CHECK (playfulness_level BETWEEN 1 AND 5),
-                    shedding_level INTEGER CHECK (shedding_level BETWEEN 1 AND 5),
-                    trainability_level INTEGER CHECK (trainability_level BETWEEN 1 AND 5),
-                    watchdog_protective_nature INTEGER CHECK (watchdog_protective_nature BETWEEN 1 AND 5),
-                    
-                    -- Arrays for multiple values
-                    coat_type TEXT[],
-                    coat_length TEXT[],
-                    
-                    -- Metadata
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create indexes
-            self.cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_breed_name ON dog_breeds(name);
-                CREATE INDEX IF NOT EXISTS idx_breed_group ON dog_breeds(breed_group);
-            """)
-
-            self.conn.commit()
-            print("Tables created successfully!")
-
-        except Exception as e:
-            self.conn.rollback()
-            print(f"Error creating tables: {e}")
-            raise e
+        """Create or upgrade the tables by applying any pending migrations"""
+        applied = migrate(self.conn)
+        if applied:
+            print(f"Applied migrations {', '.join(map(str, applied))}")
+        else:
+            print("Tables are up to date!")
 
     def close(self):
         """Close database connection"""
@@ -0,0 +1,131 @@
+import asyncio
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from async_fetcher import AsyncFetcher
+from url_frontier import UrlFrontier
+
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# AKC listing pages show 12 breeds, a full page means there may be another
+PAGE_SIZE = 12
+
+# Only the breed grid is turned into a tree, the rest of the page is skipped
+_GRID_STRAINER = SoupStrainer(class_='breed-card-type-grid')
+
+
+def listing_url(base_url, letter, page=1):
+    """URL of one page of the A-Z breed listing"""
+    if page > 1:
+        return f"{base_url}page/{page}/?letter={letter}"
+    return f"{base_url}?letter={letter}"
+
+
+def parse_breed_cards(html_content, page_url):
+    """Returns the breed cards of a listing page as {'name', 'url'} dicts.
+
+    Returns None when the page has no breed grid in its HTML, which means
+    it is rendered by JavaScript and needs a browser.
+    """
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=_GRID_STRAINER)
+    grid = soup.find(class_='breed-card-type-grid')
+    if not grid:
+        return None
+
+    breeds = []
+    for card in grid.select('.grid-col'):
+        link = card.find('a', href=True)
+        if link:
+            breeds.append({
+                'name': link.get_text().strip(),
+                'url': urljoin(page_url, link['href'])
+            })
+    return breeds
+
+
+class HttpLinkCrawler:
+    """Collects breed links from the listing pages over plain HTTP.
+
+    The first page of every letter is fetched concurrently, then each round
+    fetches the next page of the letters whose last page was full; a later
+    page that is missing (404) or has no breeds ends the letter. Requests
+    are paced by `scheduler`, or by one of its own starting at `rate`.
+    Pages that couldn't be fetched end up in `failed`.
+    """
+
+    def __init__(self, base_url, headers=None, workers=8, rate=4.0, burst=8, cache=None,
+                 scheduler=None):
+        self.base_url = base_url
+        self.headers = headers
+        self.workers = workers
+        self.rate = rate
+        self.burst = burst
+        self.cache = cache
+        self.scheduler = scheduler
+        # (letter, page) -> error of the listing pages that couldn't be fetched
+        self.failed = {}
+
+    def _parse_page(self, key, html_content):
+        letter, page = key
+        return parse_breed_cards(html_content, listing_url(self.base_url, letter, page))
+
+    async def _crawl(self, fetcher, letters):
+        pages = {}
+        needs_browser = set()
+        next_pages = [(letter, 1) for letter in letters]
+
+        while next_pages:
+            results = await fetcher.fetch_all(
+                ((letter, page), listing_url(self.base_url, letter, page))
+                for letter, page in next_pages)
+
+            following = []
+            for (letter, page), cards in zip(next_pages, results):
+                key = (letter, page)
+                error = fetcher.errors.get(key)
+                if page > 1 and (fetcher.error_statuses.get(key) == 404
+                                 or (error is None and not cards)):
+                    # The previous page held exactly PAGE_SIZE breeds and was the last
+                    continue
+                if error is not None:
+                    print(f"Couldn't fetch letter {letter} page {page}: {error}")
+                    self.failed[key] = error
+                    continue
+                if cards is None:
+                    print(f"No breed grid for letter {letter} page {page} over HTTP")
+                    needs_browser.add(letter)
+                    continue
+                print(f"Found {len(cards)} breeds for letter {letter} page {page}")
+                pages[(letter, page)] = cards
+                if len(cards) == PAGE_SIZE:
+                    following.append((letter, page + 1))
+            next_pages = following
+
+        return pages, needs_browser
+
+    def crawl(self, letters=LETTERS, frontier=None):
+        """Returns (frontier, letters_needing_browser).
+
+        Breeds are added to the frontier in letter/page order; letters whose
+        first page has no breed grid over HTTP are left for a browser
+        fallback. Pages that failed to download are in self.failed.
+        """
+        fetcher = AsyncFetcher(self._parse_page, workers=self.workers, rate=self.rate,
+                               burst=self.burst, headers=self.headers, cache=self.cache,
+                               scheduler=self.scheduler)
+        try:
+            pages, needs_browser = asyncio.run(self._crawl(fetcher, letters))
+        finally:
+            fetcher.session.close()
+
+        if frontier is None:
+            frontier = UrlFrontier()
+        for letter, page in sorted(pages):
+            if letter in needs_browser:
+                continue
+            for breed in pages[(letter, page)]:
+                frontier.add(breed['url'], breed['name'], letter, page)
+
+        return frontier, sorted(needs_browser)
@@ -0,0 +1,279 @@
+import argparse
+
+from psycopg2.extras import execute_values
+
+from db import connect
+
+
+# AKC URL slugs that don't follow the breed's name, by the slug migration 2
+# derived from the name. Shipped with the migrations so they never depend on
+# a link list being around.
+URL_SLUGS = {
+    'bouvier-des-ardennes': 'bouvier-de-ardennes',
+    'cirneco-dell-etna': 'cirneco-delletna',
+    'grand-basset-griffon-vend-en': 'grand-basset-griffon-vendeen',
+    'l-wchen': 'lowchen',
+    'petit-basset-griffon-vend-en': 'petit-basset-griffon-vendeen',
+    'saint-bernard': 'st-bernard',
+}
+
+# Rows keyed by a slug derived from the breed's name are moved to the breed's
+# URL slug, which is what the loader upserts by. breed_url_slugs holds
+# URL_SLUGS, see migrate(); if the URL slug was loaded already, the older
+# name-keyed row goes.
+_REKEY_TO_URL_SLUGS = """
+        DELETE FROM dog_breeds named
+        USING breed_url_slugs url, dog_breeds loaded
+        WHERE named.slug = url.name_slug AND loaded.slug = url.slug;
+
+        UPDATE dog_breeds
+        SET slug = url.slug
+        FROM breed_url_slugs url
+        WHERE dog_breeds.slug = url.name_slug;
+"""
+
+# Versioned schema changes for dog_breeds, applied in order and recorded in
+# schema_migrations. Each one also has to be safe against a database set up
+# by the old init_db.py, which created parts of it without recording anything.
+MIGRATIONS = [
+    (1, "create dog_breeds", """
+        CREATE TABLE IF NOT EXISTS dog_breeds (
+            id SERIAL PRIMARY KEY,
+            slug VARCHAR(100),
+            name VARCHAR(100) NOT NULL,
+            breed_group VARCHAR(50),
+            origin VARCHAR(50),
+            temperament TEXT,
+            life_expectancy VARCHAR(20),
+            year_recognized INTEGER,
+            popularity INTEGER,
+
+            -- Detailed Information
+            grooming TEXT,
+            exercise TEXT,
+            nutrition TEXT,
+            health TEXT,
+            training TEXT,
+
+            -- Traits (1-5 scale)
+            adaptability INTEGER CHECK (adaptability BETWEEN 1 AND 5),
+            affectionate_with_family INTEGER CHECK (affectionate_with_family BETWEEN 1 AND 5),
+            barking_level INTEGER CHECK (barking_level BETWEEN 1 AND 5),
+            coat_grooming_frequency INTEGER CHECK (coat_grooming_frequency BETWEEN 1 AND 5),
+            drooling_level INTEGER CHECK (drooling_level BETWEEN 1 AND 5),
+            energy_level INTEGER CHECK (energy_level BETWEEN 1 AND 5),
+            good_with_other_dogs INTEGER CHECK (good_with_other_dogs BETWEEN 1 AND 5),
+            good_with_young_children INTEGER CHECK (good_with_young_children BETWEEN 1 AND 5),
+            mental_stimulation_needs INTEGER CHECK (mental_stimulation_needs BETWEEN 1 AND 5),
+            openness_to_strangers INTEGER CHECK (openness_to_strangers BETWEEN 1 AND 5),
+            playfulness_level INTEGER CHECK (playfulness_level BETWEEN 1 AND 5),
+            shedding_level INTEGER CHECK (shedding_level BETWEEN 1 AND 5),
+            trainability_level INTEGER CHECK (trainability_level BETWEEN 1 AND 5),
+            watchdog_protective_nature INTEGER CHECK (watchdog_protective_nature BETWEEN 1 AND 5),
+
+            -- Arrays for multiple values
+            coat_type TEXT[],
+            coat_length TEXT[],
+
+            -- Metadata
+            content_hash CHAR(64),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_breed_name ON dog_breeds(name);
+        CREATE INDEX IF NOT EXISTS idx_breed_group ON dog_breeds(breed_group);
+    """),
+
+    (2, "unique breed slug", """
+        ALTER TABLE dog_breeds ADD COLUMN IF NOT EXISTS slug VARCHAR(100);
+        ALTER TABLE dog_breeds ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+
+        UPDATE dog_breeds
+        SET slug = trim(both '-' from regexp_replace(lower(name), '[^a-z0-9]+', '-', 'g'))
+        WHERE slug IS NULL;
+
+        -- Keep only the newest row of breeds inserted more than once
+        DELETE FROM dog_breeds older
+        USING dog_breeds newer
+        WHERE older.slug = newer.slug AND older.id < newer.id;
+
+        ALTER TABLE dog_breeds ALTER COLUMN slug SET NOT NULL;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_breed_slug ON dog_breeds(slug);
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'dog_breeds_slug_key') THEN
+                ALTER TABLE dog_breeds
+                ADD CONSTRAINT dog_breeds_slug_key UNIQUE USING INDEX idx_breed_slug;
+            END IF;
+        END $$;
+    """),
+
+    (3, "full-text search vector", """
+        -- Weighted so that name > temperament > care texts when ranking
+        ALTER TABLE dog_breeds ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(temperament, '')), 'B') ||
+            setweight(to_tsvector('english',
+                coalesce(health, '') || ' ' || coalesce(grooming, '') || ' ' ||
+                coalesce(exercise, '') || ' ' || coalesce(nutrition, '') || ' ' ||
+                coalesce(training, '')), 'C')
+        ) STORED;
+
+        CREATE INDEX IF NOT EXISTS idx_breed_search ON dog_breeds USING GIN (search_vector);
+    """),
+
+    (4, "numeric life expectancy, height and weight ranges", r"""
+        ALTER TABLE dog_breeds
+            ADD COLUMN IF NOT EXISTS life_expectancy_min REAL,
+            ADD COLUMN IF NOT EXISTS life_expectancy_max REAL,
+            ADD COLUMN IF NOT EXISTS height_min REAL,
+            ADD COLUMN IF NOT EXISTS height_max REAL,
+            ADD COLUMN IF NOT EXISTS weight_min REAL,
+            ADD COLUMN IF NOT EXISTS weight_max REAL;
+
+        -- Height and weight weren't stored before, the next scrape fills them in
+        UPDATE dog_breeds
+        SET life_expectancy_min = (regexp_match(life_expectancy, '\d+(?:\.\d+)?'))[1]::REAL,
+            life_expectancy_max = (regexp_match(life_expectancy, '(\d+(?:\.\d+)?)\D*$'))[1]::REAL
+        WHERE life_expectancy_min IS NULL AND life_expectancy ~ '\d';
+
+        CREATE INDEX IF NOT EXISTS idx_breed_life_expectancy
+            ON dog_breeds(life_expectancy_min, life_expectancy_max);
+        CREATE INDEX IF NOT EXISTS idx_breed_life_expectancy_max ON dog_breeds(life_expectancy_max);
+        CREATE INDEX IF NOT EXISTS idx_breed_height ON dog_breeds(height_min, height_max);
+        CREATE INDEX IF NOT EXISTS idx_breed_weight ON dog_breeds(weight_min, weight_max);
+    """),
+
+    (5, "coat arrays without the Unknown sentinel", """
+        UPDATE dog_breeds SET coat_type = NULL WHERE coat_type = '{Unknown}';
+        UPDATE dog_breeds SET coat_length = NULL WHERE coat_length = '{Unknown}';
+
+        -- For containment filters like coat_type @> '{Wiry}'
+        CREATE INDEX IF NOT EXISTS idx_breed_coat_type ON dog_breeds USING GIN (coat_type);
+        CREATE INDEX IF NOT EXISTS idx_breed_coat_length ON dog_breeds USING GIN (coat_length);
+    """),
+
+    (6, "trait filter indexes", """
+        -- Family fit: good with kids, then low shedding, then easy to train
+        CREATE INDEX IF NOT EXISTS idx_breed_family_traits ON dog_breeds
+            (good_with_young_children, shedding_level, trainability_level);
+        -- Apartment fit: adaptable, low energy, quiet
+        CREATE INDEX IF NOT EXISTS idx_breed_apartment_traits ON dog_breeds
+            (adaptability, energy_level, barking_level);
+        -- Upkeep: shedding and grooming effort
+        CREATE INDEX IF NOT EXISTS idx_breed_upkeep_traits ON dog_breeds
+            (shedding_level, coat_grooming_frequency, drooling_level);
+    """),
+
+    # For databases that got name-derived slugs from migration 2
+    (7, "key breeds by their URL slugs", _REKEY_TO_URL_SLUGS),
+
+    # Migration 7 used to read its slugs from a link list, and did nothing without one
+    (8, "key breeds by their URL slugs without a link list", _REKEY_TO_URL_SLUGS),
+
+    (9, "life expectancy bounds over every number", r"""
+        -- Migration 4 took the first and the last number, so "10-12, 8-10 years" got
+        -- 10-10; parse_range now takes the smallest and the largest, and "up to" has no
+        -- lower bound. Height and weight are recomputed by the next scrape, their
+        -- display text isn't stored.
+        UPDATE dog_breeds
+        SET life_expectancy_min = CASE WHEN life_expectancy ~* '\mup to\M' THEN NULL
+                                       ELSE bounds.low END,
+            life_expectancy_max = bounds.high
+        FROM (
+            SELECT id, min(number[1]::REAL) AS low, max(number[1]::REAL) AS high
+            FROM dog_breeds, regexp_matches(life_expectancy, '\d+(?:\.\d+)?', 'g') AS number
+            GROUP BY id
+        ) bounds
+        WHERE dog_breeds.id = bounds.id;
+    """),
+]
+
+# Any fixed key works, it only has to be the same for every migrating process
+_LOCK_KEY = 4711
+
+
+def applied_versions(conn):
+    """Versions recorded in schema_migrations"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def migrate(conn, target=None):
+    """Applies pending migrations up to target (default: all), each in its own transaction.
+
+    Concurrent runs are serialized with an advisory lock, so two scrapers
+    starting at once don't both apply the same migration. Returns the
+    versions applied.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (_LOCK_KEY,))
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS breed_url_slugs (
+                name_slug TEXT PRIMARY KEY,
+                slug TEXT NOT NULL
+            )
+        """)
+        cur.execute("TRUNCATE breed_url_slugs")
+        execute_values(cur, "INSERT INTO breed_url_slugs (name_slug, slug) VALUES %s",
+                       list(URL_SLUGS.items()))
+    try:
+        done = applied_versions(conn)
+        applied = []
+        for version, name, sql in MIGRATIONS:
+            if version in done or (target is not None and version > target):
+                continue
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(sql)
+                    cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                                (version, name))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Migration {version} ({name}) failed: {e}")
+                raise
+            print(f"Applied migration {version}: {name}")
+            applied.append(version)
+        return applied
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS breed_url_slugs")
+            cur.execute("SELECT pg_advisory_unlock(%s)", (_LOCK_KEY,))
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply dog_breeds schema migrations")
+    parser.add_argument('--target', type=int, help="stop after this version")
+    parser.add_argument('--status', action='store_true',
+                        help="list migrations and whether they are applied")
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        if args.status:
+            done = applied_versions(conn)
+            for version, name, _ in MIGRATIONS:
+                print(f"{version:>3} {'applied' if version in done else 'pending':<8} {name}")
+            return
+        applied = migrate(conn, args.target)
+        print(f"{len(applied)} migrations applied" if applied else "Schema is up to date")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
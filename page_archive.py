@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class PageArchive:
+    """Content-addressed store of raw fetched pages.
+
+    Each page body is gzip-compressed into blobs/<aa>/<sha256>.gz, keyed by
+    the SHA-256 of its text, so refetching an unchanged page costs nothing.
+    index.jsonl is an append-only log of (slug, url, hash, fetch time); the
+    last line per slug is that breed's latest snapshot.
+    """
+
+    def __init__(self, root='archive'):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.index_path = os.path.join(root, 'index.jsonl')
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[entry['slug']] = entry
+
+    def blob_path(self, content_hash):
+        return os.path.join(self.blob_dir, content_hash[:2], content_hash + '.gz')
+
+    def put(self, slug, url, text):
+        """Archives a fetched page and returns its content hash"""
+        body = text.encode('utf-8')
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self.blob_path(content_hash)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(body))
+            os.replace(tmp_path, path)
+
+        entry = {
+            'slug': slug,
+            'url': url,
+            'hash': content_hash,
+            'bytes': len(body),
+            'fetched_at': time.time()
+        }
+        with self.lock:
+            self.entries[slug] = entry
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        return content_hash
+
+    def get(self, slug):
+        """Latest archived page text for slug, or None"""
+        entry = self.entries.get(slug)
+        if not entry:
+            return None
+        return self.read_blob(entry['hash'])
+
+    def read_blob(self, content_hash):
+        with gzip.open(self.blob_path(content_hash), 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def latest(self):
+        """Latest index entry per slug"""
+        return dict(self.entries)
+
+    def stats(self):
+        """Raw size of the latest snapshot against what the blobs take on disk"""
+        raw_bytes = sum(entry['bytes'] for entry in self.entries.values())
+        stored_bytes = 0
+        blobs = 0
+        for directory, _, filenames in os.walk(self.blob_dir):
+            for filename in filenames:
+                if filename.endswith('.gz'):
+                    blobs += 1
+                    stored_bytes += os.path.getsize(os.path.join(directory, filename))
+        return {'pages': len(self.entries), 'blobs': blobs,
+                'raw_bytes': raw_bytes, 'stored_bytes': stored_bytes}
@@ -0,0 +1,110 @@
+import argparse
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from breed_parser import extract_breed_info
+from page_archive import PageArchive
+
+
+PAGE_SUFFIXES = ('.html.gz', '.html')
+
+
+def page_slug(path):
+    """Breed slug of an archived page file (affenpinscher.html -> affenpinscher)"""
+    filename = os.path.basename(path)
+    for suffix in PAGE_SUFFIXES:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return None
+
+
+def find_pages(directory):
+    """(slug, path) of the breed pages in directory, sorted by file name.
+
+    A PageArchive root yields the latest snapshot of every breed in it.
+    """
+    if os.path.exists(os.path.join(directory, 'index.jsonl')):
+        archive = PageArchive(directory)
+        return sorted((slug, archive.blob_path(entry['hash']))
+                      for slug, entry in archive.latest().items())
+
+    return sorted((page_slug(filename), os.path.join(directory, filename))
+                  for filename in os.listdir(directory) if page_slug(filename))
+
+
+def read_page(path):
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_page_file(page):
+    """Reads and parses one (slug, path) page, returning (slug, breed_info, error).
+
+    Runs inside the worker processes, so the page is read there and only the
+    small parsed record travels back to the parent.
+    """
+    slug, path = page
+    try:
+        return slug, extract_breed_info(slug, read_page(path)), None
+    except Exception as e:
+        return slug, None, f"{type(e).__name__}: {e}"
+
+
+def parse_pages(pages, workers=None, chunksize=16):
+    """Parses (slug, path) pages across a process pool, yielding results in input order.
+
+    workers=1 parses inline without starting any processes.
+    """
+    if workers == 1:
+        for page in pages:
+            yield parse_page_file(page)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(parse_page_file, pages, chunksize=chunksize)
+
+
+def parse_archive(directory, workers=None, chunksize=16):
+    """Parses every page in directory (or PageArchive root), returning (records, errors)"""
+    records = []
+    errors = {}
+    for slug, breed_info, error in parse_pages(find_pages(directory), workers, chunksize):
+        if error:
+            errors[slug] = error
+        else:
+            records.append(breed_info)
+    return records, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parse a page archive or a directory of saved breed pages into breed records")
+    parser.add_argument('directory')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="parser processes, defaults to the number of CPUs")
+    parser.add_argument('--chunksize', type=int, default=16)
+    parser.add_argument('--output', default='parsed_breeds.json')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records, errors = parse_archive(args.directory, args.workers, args.chunksize)
+    elapsed = time.perf_counter() - start
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4, ensure_ascii=False)
+
+    for slug, error in errors.items():
+        print(f"Error parsing {slug}: {error}")
+    total = len(records) + len(errors)
+    print(f"Parsed {len(records)} of {total} pages in {elapsed:.2f}s "
+          f"({total / elapsed if elapsed else 0:.1f} pages/sec), saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+
+# Statuses that mean "slow down" rather than "this page is broken"
+THROTTLE_STATUSES = frozenset([429, 503])
+RETRY_STATUSES = THROTTLE_STATUSES | frozenset([500, 502, 504])
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostPacer:
+    """AIMD request pacing for one host.
+
+    Requests are spaced by a token bucket refilled at `rate` per second with
+    bursts of `burst`. Every fast, clean response adds `increase` to the
+    rate, up to max_rate; a slow one (over slow_seconds) multiplies it by
+    `decrease`. A 429/503, 5xx or connection error halves it and blocks
+    the host for an exponential backoff with jitter, or for as long as
+    Retry-After asks, whichever is longer.
+    """
+
+    def __init__(self, rate=2.0, burst=4, min_rate=0.2, max_rate=8.0, increase=0.25,
+                 decrease=0.8, slow_seconds=2.0, backoff_base=2.0, backoff_max=120.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self.min_rate = min(min_rate, self.rate)
+        self.max_rate = max(max_rate, self.rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.lock = threading.Lock()
+        self.tokens = float(self.capacity)
+        # When tokens were last refilled; set into the future to pause the host
+        self.updated = time.monotonic()
+        self.failures = 0
+        self.backoffs = 0
+
+    def reserve(self):
+        """Takes the next request slot, returning how many seconds to wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            if now > self.updated:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            # Tokens go negative while callers queue up, each waits for its own slot
+            self.tokens -= 1
+            debt = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(self.updated - now, 0.0) + debt
+
+    def success(self, seconds):
+        with self.lock:
+            self.failures = 0
+            if seconds > self.slow_seconds:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttled(self, retry_after=None):
+        """Backs off after a throttling response or a failed connection"""
+        with self.lock:
+            self.failures += 1
+            self.backoffs += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (self.failures - 1))
+            # "Equal jitter": at least half the backoff, so retries don't line up
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.backoff_max))
+            # Pause the host, then refill from empty so there's no burst after the pause
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, time.monotonic() + delay)
+
+
+class PoliteScheduler:
+    """Shares adaptive per-host pacing between the crawlers and fetchers of a run.
+
+    watch(session) feeds it the status and latency of every response the
+    session receives; fetch() and fetch_async() wait for a slot before each
+    request and retry throttled or failed ones. Given a RunMetrics, they time
+    the wait for a slot (pacing and backoff) as 'pacing_wait' and only the
+    request itself as 'fetch'. Safe to use from threads.
+    """
+
+    def __init__(self, rate=2.0, burst=4, max_rate=None, max_attempts=4, **pacing):
+        self.rate = rate
+        self.burst = burst
+        # By default a host may be sped up to four times the starting rate
+        self.max_rate = max_rate or rate * 4
+        self.max_attempts = max_attempts
+        self.pacing = pacing
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.retries = 0
+
+    def pacer(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostPacer(self.rate, self.burst, max_rate=self.max_rate,
+                                             **self.pacing)
+            return self.hosts[host]
+
+    def watch(self, session):
+        """Paces by every response session receives"""
+        session.hooks['response'].append(self._on_response)
+        return session
+
+    def _on_response(self, response, *args, **kwargs):
+        self.record(response.url, response.status_code, response.elapsed.total_seconds(),
+                    response.headers.get('Retry-After'))
+
+    def record(self, url, status, seconds, retry_after=None):
+        """Adjusts the pace of url's host after a response"""
+        pacer = self.pacer(url)
+        if status in RETRY_STATUSES:
+            pacer.throttled(retry_after_seconds(retry_after))
+        else:
+            pacer.success(seconds)
+
+    def wait(self, url):
+        """Sleeps until url's host has a free slot, for callers that don't use fetch()"""
+        time.sleep(self.pacer(url).reserve())
+
+    def failed(self, url, retry_after=None):
+        """Backs url's host off after a failure seen outside requests, e.g. in a browser"""
+        self.pacer(url).throttled(retry_after)
+
+    def _should_retry(self, url, error, attempt):
+        """Whether to try again after error; connection errors also slow the host down"""
+        if attempt >= self.max_attempts:
+            return False
+        if isinstance(error, requests.HTTPError):
+            retry = error.response is not None and error.response.status_code in RETRY_STATUSES
+        elif isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            self.failed(url)
+            retry = True
+        else:
+            retry = False
+        if retry:
+            with self.lock:
+                self.retries += 1
+        return retry
+
+    @staticmethod
+    def _stage(metrics, name, key):
+        return metrics.stage(name, key) if metrics else nullcontext()
+
+    def fetch(self, get, url, metrics=None, key=None):
+        """Calls get(url) once url's host has a free slot, retrying throttled requests"""
+        attempt = 0
+        while True:
+            attempt += 1
+            with self._stage(metrics, 'pacing_wait', key):
+                self.wait(url)
+            try:
+                with self._stage(metrics, 'fetch', key):
+                    return get(url)
+            except Exception as e:
+                if not self._should_retry(url, e, attempt):
+                    raise
+
+    async def fetch_async(self, get, url, executor=None, metrics=None, key=None):
+        """fetch() for the event loop: waits without blocking and runs get on executor"""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            attempt += 1
+            with self._stage(metrics, 'pacing_wait', key):
+                await asyncio.sleep(self.pacer(url).reserve())
+            try:
+                with self._stage(metrics, 'fetch', key):
+                    return await loop.run_in_executor(executor, get, url)
+            except Exception as e:
+                if not self._should_retry(url, e, attempt):
+                    raise
+
+    def stats(self):
+        with self.lock:
+            return {
+                'retries': self.retries,
+                'hosts': {host: {'rate': round(pacer.rate, 2), 'backoffs': pacer.backoffs}
+                          for host, pacer in self.hosts.items()}
+            }
+
+    def summary(self):
+        stats = self.stats()
+        hosts = ', '.join(f"{host} {host_stats['rate']:.2f} req/s "
+                          f"({host_stats['backoffs']} backoffs)"
+                          for host, host_stats in stats['hosts'].items())
+        return f"Pacing: {hosts or 'no requests'}, {stats['retries']} retries"
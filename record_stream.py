@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+import zlib
+
+
+PART_SUFFIX = '.part'
+
+
+def _format_name(path):
+    """path without the .part suffix, which decides how the file is read"""
+    return path[:-len(PART_SUFFIX)] if path.endswith(PART_SUFFIX) else path
+
+
+def _open(path, mode):
+    if _format_name(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class NdjsonWriter:
+    """Writes records as newline-delimited JSON, gzip-compressed if path ends in .gz.
+
+    Lines go to path + '.part' and are flushed as they are written, so a
+    run that dies still leaves every record written so far readable with
+    read_records(). close() renames the finished file to path atomically;
+    leaving a `with` block through an exception keeps the .part file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.part_path = path + PART_SUFFIX
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = _open(self.part_path, 'w')
+        self.count = 0
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        self.file.write('\n')
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        """Finishes the file and moves it into place"""
+        if self.file.closed:
+            return
+        self.file.close()
+        os.replace(self.part_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+
+def read_records(path):
+    """Yields the records of an NDJSON file (.gz too) one at a time.
+
+    A truncated last line or gzip stream, as left in the .part file of an
+    interrupted writer, ends the records instead of raising; an undecodable
+    line with more records after it raises ValueError. Plain .json files
+    holding a list, the older output format, are read whole.
+    """
+    if _format_name(path).endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+
+    with _open(path, 'r') as f:
+        # Number of an undecodable line, fine as long as it turns out to be the last one
+        bad_line = None
+        try:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                if bad_line is not None:
+                    raise ValueError(f"{path}: line {bad_line} is not valid JSON")
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    bad_line = number
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            return
@@ -0,0 +1,130 @@
+import json
+import os
+import time
+
+
+PENDING = 'pending'
+FETCHED = 'fetched'
+PARSED = 'parsed'
+LOADED = 'loaded'
+FAILED = 'failed'
+
+
+class RunJournal:
+    """Append-only JSONL log of per-item progress through a scrape run.
+
+    Every state change is appended as one line, and reopening the journal
+    replays it, so a restarted run knows which items are already loaded and
+    which failed. Failed items are retried with exponential backoff until
+    max_attempts is reached.
+    """
+
+    def __init__(self, path, max_attempts=3, backoff_base=5.0, backoff_max=300.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.records = {}
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A run killed mid-write leaves a truncated last line
+                        continue
+                    self.records[record['key']] = record
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, key):
+        return self.records.get(key)
+
+    def mark(self, key, state, **data):
+        """Records a new state for key; extra keyword arguments are stored with it"""
+        previous = self.records.get(key, {})
+        record = {
+            'key': key,
+            'state': state,
+            'time': time.time(),
+            'attempts': previous.get('attempts', 0),
+            'error': None,
+            'retry_at': None
+        }
+        if data:
+            record['data'] = data
+        self._append(record)
+        return record
+
+    def fail(self, key, error):
+        """Records a failure and schedules the next retry with exponential backoff"""
+        attempts = self.records.get(key, {}).get('attempts', 0) + 1
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        record = {
+            'key': key,
+            'state': FAILED,
+            'time': time.time(),
+            'attempts': attempts,
+            'error': str(error),
+            'retry_at': time.time() + delay if attempts < self.max_attempts else None
+        }
+        self._append(record)
+        return record
+
+    def _append(self, record):
+        self.records[record['key']] = record
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def is_done(self, key):
+        record = self.records.get(key)
+        return bool(record) and record['state'] == LOADED
+
+    def is_exhausted(self, key):
+        """True for items that failed max_attempts times"""
+        record = self.records.get(key)
+        return bool(record) and record['state'] == FAILED and record['retry_at'] is None
+
+    def todo(self, keys, now=None):
+        """Keys that still need work right now: not loaded, not exhausted, backoff elapsed"""
+        now = time.time() if now is None else now
+        pending = []
+        for key in keys:
+            record = self.records.get(key)
+            if not record:
+                pending.append(key)
+            elif record['state'] == FAILED:
+                if record['retry_at'] is not None and record['retry_at'] <= now:
+                    pending.append(key)
+            elif record['state'] != LOADED:
+                pending.append(key)
+        return pending
+
+    def next_retry_at(self, keys):
+        """Earliest scheduled retry among keys, or None if nothing is waiting"""
+        times = [self.records[key]['retry_at'] for key in keys
+                 if key in self.records and self.records[key]['state'] == FAILED
+                 and self.records[key]['retry_at'] is not None]
+        return min(times) if times else None
+
+    def summary(self, keys=None):
+        """Counts of items per state"""
+        keys = self.records.keys() if keys is None else keys
+        counts = {}
+        for key in keys:
+            state = self.records[key]['state'] if key in self.records else PENDING
+            counts[state] = counts.get(state, 0) + 1
+        return counts
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+def _percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class RunMetrics:
+    """Per-stage timings and counters of one scrape run.
+
+    stage() times a block under a stage name (discovery, pacing_wait, fetch,
+    parse, clean, db_write), optionally for one breed; count() bumps a
+    counter, and a requests.Session passed to watch() counts the status code
+    and body bytes of every response. Safe to use from the fetcher's worker threads.
+    report() summarizes everything as a dict, written out by write_json()
+    and, in Prometheus text format, by write_prometheus().
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.lock = threading.Lock()
+        # stage -> durations in seconds, one per timed block
+        self.timings = defaultdict(list)
+        # breed -> {stage: seconds}
+        self.breeds = defaultdict(lambda: defaultdict(float))
+        self.counters = defaultdict(int)
+        self.statuses = defaultdict(int)
+
+    @contextmanager
+    def stage(self, name, key=None):
+        """Times the block as one run of stage name, for breed key if given"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, key)
+
+    def record(self, name, seconds, key=None):
+        with self.lock:
+            self.timings[name].append(seconds)
+            if key is not None:
+                self.breeds[key][name] += seconds
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def watch(self, session):
+        """Counts the status and size of every response session receives"""
+        session.hooks['response'].append(self._on_response)
+        return session
+
+    def _on_response(self, response, *args, **kwargs):
+        with self.lock:
+            self.statuses[response.status_code] += 1
+            self.counters['requests'] += 1
+            self.counters['bytes_received'] += len(response.content)
+
+    def report(self):
+        """The run so far as a JSON-serializable dict"""
+        with self.lock:
+            stages = {}
+            for name, durations in self.timings.items():
+                ordered = sorted(durations)
+                stages[name] = {
+                    'count': len(ordered),
+                    'total_seconds': round(sum(ordered), 4),
+                    'mean_seconds': round(sum(ordered) / len(ordered), 4),
+                    'p50_seconds': round(_percentile(ordered, 0.5), 4),
+                    'p95_seconds': round(_percentile(ordered, 0.95), 4),
+                    'max_seconds': round(ordered[-1], 4)
+                }
+            return {
+                'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                'wall_seconds': round(time.time() - self.started, 4),
+                'stages': stages,
+                'counters': dict(self.counters),
+                'http_statuses': {str(code): n for code, n in sorted(self.statuses.items())},
+                'breeds': {key: {name: round(seconds, 4) for name, seconds in timings.items()}
+                           for key, timings in sorted(self.breeds.items())}
+            }
+
+    def write_json(self, path):
+        """Writes report() to path, replacing it atomically"""
+        report = self.report()
+        _write_atomic(path, json.dumps(report, indent=2) + '\n')
+        return report
+
+    def write_prometheus(self, path, prefix='breed_scraper'):
+        """Writes the run totals in Prometheus text format, e.g. for the node_exporter textfile collector"""
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_run_seconds Wall time of the run.",
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {report['wall_seconds']}",
+            f"# HELP {prefix}_stage_seconds_total Time spent per pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {stats["total_seconds"]}'
+                  for name, stats in sorted(report['stages'].items())]
+        lines += [
+            f"# HELP {prefix}_stage_runs_total Timed runs per pipeline stage.",
+            f"# TYPE {prefix}_stage_runs_total counter",
+        ]
+        lines += [f'{prefix}_stage_runs_total{{stage="{name}"}} {stats["count"]}'
+                  for name, stats in sorted(report['stages'].items())]
+        lines += [
+            f"# HELP {prefix}_http_responses_total HTTP responses by status code.",
+            f"# TYPE {prefix}_http_responses_total counter",
+        ]
+        lines += [f'{prefix}_http_responses_total{{code="{code}"}} {n}'
+                  for code, n in report['http_statuses'].items()]
+        for name, value in sorted(report['counters'].items()):
+            metric = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        _write_atomic(path, '\n'.join(lines) + '\n')
+
+    def summary(self):
+        report = self.report()
+        stages = ', '.join(f"{name} {stats['total_seconds']:.2f}s"
+                           for name, stats in report['stages'].items())
+        statuses = ', '.join(f"{code}: {n}" for code, n in report['http_statuses'].items())
+        return (f"Run metrics: {report['wall_seconds']:.1f}s wall ({stages or 'no stages'}); "
+                f"HTTP {statuses or 'none'}; "
+                f"{report['counters'].get('bytes_received', 0) / (1024 * 1024):.1f} MB received")
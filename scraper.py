@@ -1,34 +1,31 @@
-import json
-from bs4 import BeautifulSoup
 import re
+from breed_props import extract_breed_props
+from html_text import html_to_text
 
 
 def extract_breed_data(html_content):
-    # Find the data-js-props attribute content
-    soup = BeautifulSoup(html_content, 'html.parser')
-    breed_div = soup.find('div', {'data-js-component': 'breedPage'})
+    # Find and parse the data-js-props attribute content
+    json_data = extract_breed_props(html_content)
 
-    if not breed_div:
+    if not json_data:
         return None
 
-    # Parse the JSON data from the data-js-props attribute
-    json_data = json.loads(breed_div['data-js-props'])
-
     # Get breed name from URL
     breed_name = json_data['settings']['current_breed']
+    settings = json_data['settings']['breed_data']
 
     # Extract data from the JSON structure
     breed_data = {
-        'name': json_data['settings']['basics'][breed_name]['breed_name'],
-        'group': json_data['settings']['basics'][breed_name]['breed_group'],
+        'name': settings['basics'][breed_name]['breed_name'],
+        'group': settings['basics'][breed_name]['breed_group'],
         'height': None,  # Not directly available in JSON
         'weight': None,  # Not directly available in JSON
-        'life_expectancy': json_data['settings']['basics'][breed_name]['life_expectancy'],
-        'temperament': json_data['settings']['traits'][breed_name]['temperament'],
-        'origin': json_data['settings']['basics'][breed_name]['origin'],
-        'description': json_data['settings']['description'][breed_name]['akc_org_about'].strip('<p>').strip('</p>'),
-        'grooming': json_data['settings']['health'][breed_name]['akc_org_grooming'].strip('<p>').strip('</p>'),
-        'health': json_data['settings']['health'][breed_name]['akc_org_health'].strip('<p>').strip('</p>')
+        'life_expectancy': settings['basics'][breed_name]['life_expectancy'],
+        'temperament': settings['traits'][breed_name]['temperament'],
+        'origin': settings['basics'][breed_name]['origin'],
+        'description': html_to_text(settings['description'][breed_name]['akc_org_about'], paragraphs=True),
+        'grooming': html_to_text(settings['health'][breed_name]['akc_org_grooming'], paragraphs=True),
+        'health': html_to_text(settings['health'][breed_name]['akc_org_health'], paragraphs=True)
     }
 
     return breed_data
@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+
+from breed_fields import breed_slug, content_hash
+from record_stream import read_records
+
+
+# Where a link was listed, not what it links to
+IGNORED_FIELDS = frozenset(['letter', 'page'])
+
+SNAPSHOT_SUFFIXES = ('.json', '.ndjson', '.ndjson.gz')
+
+
+def snapshot_paths(output_dir='output', prefix='dog_breeds_'):
+    """Saved snapshots in output_dir, oldest first by the timestamp in their name"""
+    if not os.path.isdir(output_dir):
+        return []
+    return sorted(os.path.join(output_dir, name) for name in os.listdir(output_dir)
+                  if name.startswith(prefix) and name.endswith(SNAPSHOT_SUFFIXES))
+
+
+def load_snapshot(path):
+    return list(read_records(path))
+
+
+def snapshot_key(item):
+    """The slug identifying a link ({'name', 'url'}) or a breed record in a snapshot"""
+    return breed_slug(item)
+
+
+def flatten(item, prefix=''):
+    """A snapshot item as {field: value}, nested dicts as dotted fields ("traits.energy_level")"""
+    fields = {}
+    for name, value in item.items():
+        if not prefix and name in IGNORED_FIELDS:
+            continue
+        if isinstance(value, dict):
+            fields.update(flatten(value, f"{prefix}{name}."))
+        else:
+            fields[f"{prefix}{name}"] = value
+    return fields
+
+
+def index_snapshot(items):
+    """slug -> (content hash, flattened item); a slug listed twice keeps its last entry"""
+    index = {}
+    for item in items:
+        fields = flatten(item)
+        index[snapshot_key(item)] = (content_hash(sorted(fields.items())), fields)
+    return index
+
+
+def field_deltas(old, new):
+    """{field: [old value, new value]} for the fields that differ, missing fields as None"""
+    return {field: [old.get(field), new.get(field)]
+            for field in sorted(old.keys() | new.keys())
+            if old.get(field) != new.get(field)}
+
+
+class SnapshotDiff:
+    """Added, removed and changed breeds between two snapshots.
+
+    Both snapshots are indexed by slug with a content hash per breed, so
+    the diff is one pass over each; field-level deltas are only worked out
+    for breeds whose hashes differ. Works on link lists and on full breed
+    record lists alike.
+    """
+
+    def __init__(self, old_items, new_items):
+        old = index_snapshot(old_items)
+        new = index_snapshot(new_items)
+        self.added = [slug for slug in new if slug not in old]
+        self.removed = [slug for slug in old if slug not in new]
+        self.changed = {}
+        self.unchanged = 0
+        for slug, (digest, fields) in new.items():
+            if slug not in old:
+                continue
+            old_digest, old_fields = old[slug]
+            if digest == old_digest:
+                self.unchanged += 1
+            else:
+                self.changed[slug] = field_deltas(old_fields, fields)
+
+    @classmethod
+    def from_files(cls, old_path, new_path):
+        return cls(load_snapshot(old_path), load_snapshot(new_path))
+
+    def changed_slugs(self):
+        """Slugs worth fetching again: new breeds first, then changed ones"""
+        return self.added + list(self.changed)
+
+    def to_dict(self):
+        return {
+            'added': self.added,
+            'removed': self.removed,
+            'changed': self.changed,
+            'unchanged': self.unchanged
+        }
+
+    def summary(self):
+        return (f"{len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.changed)} changed, {self.unchanged} unchanged")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two breed snapshots (link lists or breed records)")
+    parser.add_argument('old', nargs='?', help="defaults to the second newest output/ snapshot")
+    parser.add_argument('new', nargs='?', help="defaults to the newest output/ snapshot")
+    parser.add_argument('--json', action='store_true', help="print the full diff as JSON")
+    args = parser.parse_args()
+
+    if args.old and args.new:
+        old_path, new_path = args.old, args.new
+    else:
+        paths = snapshot_paths()
+        if len(paths) < 2:
+            print("Need two snapshots in output/ to compare")
+            return
+        old_path, new_path = paths[-2], paths[-1]
+
+    diff = SnapshotDiff.from_files(old_path, new_path)
+    if args.json:
+        print(json.dumps(diff.to_dict(), indent=2, ensure_ascii=False))
+        return
+
+    print(f"{old_path} -> {new_path}: {diff.summary()}")
+    for slug in diff.added:
+        print(f"+ {slug}")
+    for slug in diff.removed:
+        print(f"- {slug}")
+    for slug, deltas in diff.changed.items():
+        print(f"~ {slug}")
+        for field, (old, new) in deltas.items():
+            print(f"    {field}: {old!r} -> {new!r}")
+
+
+if __name__ == "__main__":
+    main()
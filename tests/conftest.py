@@ -0,0 +1,61 @@
+import importlib.util
+import os
+import sys
+
+import psycopg2
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from db import connect  # noqa: E402
+from fixture_server import start_fixture_server  # noqa: E402
+
+
+def load_script(filename):
+    """Imports one of the hyphenated top-level scripts as a module"""
+    spec = importlib.util.spec_from_file_location(
+        filename[:-3].replace('-', '_'), os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def scratch_db(monkeypatch):
+    """An empty database that db.connect() and Database use, dropped afterwards.
+
+    Skips the test when Postgres (configured from the environment / .env)
+    can't be reached.
+    """
+    name = f"dog_breeds_test_{os.getpid()}"
+    try:
+        admin = connect(dbname='postgres')
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres is not available: {e}")
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {name}")
+        cur.execute(f"CREATE DATABASE {name} ENCODING 'UTF8' TEMPLATE template0")
+    monkeypatch.setenv('DB_NAME', name)
+    try:
+        yield name
+    finally:
+        with admin.cursor() as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        admin.close()
+
+
+@pytest.fixture
+def server():
+    """The stand-in for akc.org on a free port, listing the breeds of output/"""
+    server = start_fixture_server(os.path.join(ROOT, 'page_source.html'),
+                                  output_dir=os.path.join(ROOT, 'output'))
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_port}/dog-breeds/"
@@ -0,0 +1,28 @@
+import pytest
+
+from breed_fields import breed_slug, parse_range, slugify
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("12-15 years", (12, 15)),
+    ("9-11.5 inches", (9, 11.5)),
+    ("14 years", (14, 14)),
+    # Every number counts, not the first and the last
+    ("24-26 inches (male), 22-24 inches (female)", (22, 26)),
+    ("10-12, 8-10 years", (8, 12)),
+    # "up to" states a maximum only
+    ("Up to 18 pounds", (None, 18)),
+    ("up to 10-12 years", (None, 12)),
+    ("Unknown", (None, None)),
+    ("", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_range(text, expected):
+    assert parse_range(text) == expected
+
+
+def test_breed_slug_prefers_the_url():
+    link = {'name': 'Saint Bernard', 'url': 'https://www.akc.org/dog-breeds/st-bernard/'}
+    assert slugify(link['name']) == 'saint-bernard'
+    assert breed_slug(link) == 'st-bernard'
+    assert breed_slug(dict(link, slug='given')) == 'given'
@@ -0,0 +1,14 @@
+import pytest
+
+from benchmarks.bench_clean_html import GOLDEN_CASES, fixture_fragments, soup_text
+from html_text import html_to_text
+
+
+@pytest.mark.parametrize('fragment', GOLDEN_CASES + fixture_fragments())
+def test_same_text_as_soup(fragment):
+    assert html_to_text(fragment) == soup_text(fragment)
+
+
+def test_paragraphs():
+    fragment = '<p>one<br>two</p>\n<p>three</p>'
+    assert html_to_text(fragment, paragraphs=True) == 'one\ntwo\n\nthree'
@@ -0,0 +1,59 @@
+import fixture_server
+from conftest import base_url
+from link_crawler import LETTERS, HttpLinkCrawler
+from politeness import PoliteScheduler
+
+# Pacing fast enough that the fixture runs don't wait on it
+FAST = {'rate': 1000.0, 'burst': 100}
+
+NO_GRID = '<html><body><div id="app">Loading...</div></body></html>'
+
+
+def test_crawl_fixture(server):
+    crawler = HttpLinkCrawler(base_url(server), **FAST)
+    frontier, needs_browser = crawler.crawl(LETTERS)
+    # C has exactly two full pages, so page 3 is a 404 that ends the letter
+    assert len(frontier) == len(server.breeds) == 290
+    assert crawler.failed == {}
+    assert needs_browser == []
+
+
+def test_connection_errors_fail_the_page():
+    # Retried like any connection error, just without the real backoff
+    scheduler = PoliteScheduler(backoff_base=0.01, **FAST)
+    crawler = HttpLinkCrawler('http://127.0.0.1:1/dog-breeds/', scheduler=scheduler)
+    frontier, needs_browser = crawler.crawl('AB')
+    assert sorted(crawler.failed) == [('A', 1), ('B', 1)]
+    # A page that didn't load says nothing about whether it needs a browser
+    assert needs_browser == []
+    assert len(frontier) == 0
+    assert scheduler.retries > 0
+
+
+def test_http_errors_fail_the_page(server, monkeypatch):
+    # A missing first page is an error, only later pages end a letter with a 404
+    render = fixture_server.render_listing
+    monkeypatch.setattr(fixture_server, 'render_listing', lambda breeds, letter, page: (
+        None if letter == 'A' else render(breeds, letter, page)))
+    crawler = HttpLinkCrawler(base_url(server), **FAST)
+    frontier, needs_browser = crawler.crawl('AB')
+    assert list(crawler.failed) == [('A', 1)]
+    assert needs_browser == []
+    assert len(frontier) == 47
+
+
+def test_browser_only_for_first_pages_without_grid(server, monkeypatch):
+    render = fixture_server.render_listing
+
+    def listing(breeds, letter, page):
+        if (letter, page) in (('A', 1), ('B', 2)):
+            return NO_GRID
+        return render(breeds, letter, page)
+
+    monkeypatch.setattr(fixture_server, 'render_listing', listing)
+    crawler = HttpLinkCrawler(base_url(server), **FAST)
+    frontier, needs_browser = crawler.crawl('ABC')
+    assert needs_browser == ['A']
+    assert crawler.failed == {}
+    # B stops after its first page, C's 24 breeds end with the 404 of page 3
+    assert len(frontier) == 12 + 24
@@ -0,0 +1,50 @@
+from db import connect
+from migrations import MIGRATIONS, applied_versions, migrate
+
+
+def test_rekey_without_link_list(scratch_db):
+    conn = connect()
+    try:
+        # A database that got its slugs from the breed names in migration 2
+        migrate(conn, target=6)
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO dog_breeds (slug, name, life_expectancy) VALUES
+                ('akita', 'Akita', '10-13 years'),
+                ('saint-bernard', 'Saint Bernard', '8-10 years'),
+                ('l-wchen', 'Löwchen', '13-15 years'),
+                ('bouvier-des-ardennes', 'Bouvier des Ardennes', '10-12, 8-10 years'),
+                ('bouvier-de-ardennes', 'Bouvier des Ardennes', 'Up to 14 years')
+            """)
+        conn.commit()
+
+        assert migrate(conn) == [version for version, _, _ in MIGRATIONS if version > 6]
+        assert applied_versions(conn) == {version for version, _, _ in MIGRATIONS}
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT slug, life_expectancy_min, life_expectancy_max
+                FROM dog_breeds ORDER BY slug
+            """)
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    # The name-keyed Bouvier goes, its URL-keyed row was loaded already
+    assert rows == [
+        ('akita', 10, 13),
+        ('bouvier-de-ardennes', None, 14),
+        ('lowchen', 13, 15),
+        ('st-bernard', 8, 10),
+    ]
+
+
+def test_migrate_is_idempotent(scratch_db):
+    conn = connect()
+    try:
+        assert migrate(conn)
+        assert migrate(conn) == []
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('breed_url_slugs')")
+            assert cur.fetchone() == (None,)
+    finally:
+        conn.close()
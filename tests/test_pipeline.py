@@ -0,0 +1,54 @@
+import os
+
+from conftest import ROOT, base_url, load_script
+from db import connect
+from migrations import migrate
+from snapshot_diff import snapshot_paths
+
+details = load_script('breed-details-scraper.py')
+
+
+def scrape(server, links, tmp_path):
+    """One breed-details run over the fixture server, returning its run report"""
+    scraper = details.BreedDetailsScraper(
+        base_url=base_url(server), cache_dir=str(tmp_path / 'cache'), archive_dir=None,
+        db_pool_size=2, rate=1000.0, burst=100)
+    scraper.process_all_breeds(links, journal_path=str(tmp_path / 'links.journal.jsonl'))
+    return scraper.metrics.report()
+
+
+def test_scrape_twice(scratch_db, server, tmp_path):
+    conn = connect()
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+    links = snapshot_paths(os.path.join(ROOT, 'output'))[-1]
+
+    first = scrape(server, links, tmp_path)
+    assert first['counters']['breeds_found'] == 290
+    assert first['counters']['breeds_inserted'] == 290
+    assert first['counters'].get('load_failures', 0) == 0
+    assert first['http_statuses'] == {'200': 290}
+    # A finished run leaves no journal to resume from
+    assert not os.path.exists(tmp_path / 'links.journal.jsonl')
+
+    # The cached pages come back 304 Not Modified and every row is left alone
+    second = scrape(server, links, tmp_path)
+    assert second['counters']['breeds_unchanged'] == 290
+    assert second['counters'].get('breeds_inserted', 0) == 0
+    assert second['counters'].get('breeds_updated', 0) == 0
+    assert second['http_statuses'] == {'304': 290}
+
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*), count(DISTINCT slug), count(content_hash) "
+                        "FROM dog_breeds")
+            assert cur.fetchone() == (290, 290, 290)
+            # Breeds are keyed by their URL slugs, not slugs of their names
+            cur.execute("SELECT slug FROM dog_breeds WHERE slug IN "
+                        "('st-bernard', 'saint-bernard', 'lowchen', 'l-wchen') ORDER BY slug")
+            assert cur.fetchall() == [('lowchen',), ('st-bernard',)]
+    finally:
+        conn.close()
@@ -0,0 +1,17 @@
+from benchmarks.bench_text_search import PHRASE_CASES, PHRASE_DOCUMENTS
+from text_index import BM25Index
+
+
+def test_phrases():
+    index = BM25Index()
+    for slug, *fields in PHRASE_DOCUMENTS:
+        index.add(slug, *fields)
+    for query, expected in PHRASE_CASES:
+        assert sorted(slug for slug, _ in index.search(query)) == expected, query
+
+
+def test_stop_words_dont_count_towards_length():
+    index = BM25Index()
+    index.add('a', "The dog and the cat", "of")
+    assert index.lengths == [2]
+    assert index.search("the") == []
@@ -0,0 +1,161 @@
+import math
+import re
+from collections import defaultdict
+
+from breed_fields import BREED_COLUMNS, TEXT_COLUMNS
+
+
+# Fields searched, in the order they are indexed into a document
+SEARCH_COLUMNS = ['name', 'temperament'] + TEXT_COLUMNS
+
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have if in into is it its of on or "
+    "such that the their them then there these they this to was were will with".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+
+def words(text):
+    """Lowercase word tokens of text, stop words included"""
+    return _TOKEN.findall(text.lower())
+
+
+def tokenize(text):
+    """Lowercase word tokens of text, without stop words"""
+    return [token for token in words(text) if token not in STOP_WORDS]
+
+
+def search_breeds(conn, query, limit=10, table='dog_breeds'):
+    """(slug, name, rank) of the breeds matching a web-style query, using search_vector.
+
+    Quoted phrases must match as phrases, -word excludes a word.
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT slug, name, ts_rank_cd(search_vector, query) AS rank
+            FROM {table}, websearch_to_tsquery('english', %s) query
+            WHERE search_vector @@ query
+            ORDER BY rank DESC, slug
+            LIMIT %s
+        """, (query, limit))
+        return cur.fetchall()
+
+
+class BM25Index:
+    """In-process inverted index over the breed text fields, ranked with Okapi BM25.
+
+    For consumers of the JSON or Parquet exports that have no Postgres to
+    ask. Postings keep word positions, stop words included, so quoted
+    phrases in a query only match documents that contain those exact words
+    next to each other within one field.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.slugs = []
+        self.lengths = []
+        # word -> {document -> [positions]}; stop words are only used for phrases
+        self.postings = defaultdict(dict)
+
+    def __len__(self):
+        return len(self.slugs)
+
+    def add(self, slug, *fields):
+        """Indexes a document made of one or more text fields"""
+        document = len(self.slugs)
+        self.slugs.append(slug)
+        positions = {}
+        position = 0
+        length = 0
+        for text in fields:
+            for word in words(text or ''):
+                if word in positions:
+                    positions[word].append(position)
+                else:
+                    positions[word] = [position]
+                if word not in STOP_WORDS:
+                    length += 1
+                position += 1
+            # Skip a position between fields so a phrase can't run from one into the next
+            position += 1
+        self.lengths.append(length)
+        for word, word_positions in positions.items():
+            self.postings[word][document] = word_positions
+
+    @classmethod
+    def from_rows(cls, rows, **kwargs):
+        """Indexes dog_breeds rows ordered like BREED_COLUMNS"""
+        offsets = [BREED_COLUMNS.index(column) for column in SEARCH_COLUMNS]
+        index = cls(**kwargs)
+        for row in rows:
+            index.add(row[0], *(row[offset] for offset in offsets))
+        return index
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """Indexes BreedRecords or breed_info dicts"""
+        index = cls(**kwargs)
+        for record in records:
+            if isinstance(record, dict):
+                index.add(record['slug'], *(record.get(column) for column in SEARCH_COLUMNS))
+            else:
+                index.add(record.slug, *(getattr(record, column) for column in SEARCH_COLUMNS))
+        return index
+
+    @classmethod
+    def from_table(cls, table, **kwargs):
+        """Indexes an exported Arrow table (see breed_export)"""
+        columns = [table.column(column).to_pylist() for column in SEARCH_COLUMNS]
+        index = cls(**kwargs)
+        for slug, *texts in zip(table.column('slug').to_pylist(), *columns):
+            index.add(slug, *texts)
+        return index
+
+    def _idf(self, token):
+        frequency = len(self.postings.get(token, ()))
+        return math.log(1 + (len(self.slugs) - frequency + 0.5) / (frequency + 0.5))
+
+    def _phrase_documents(self, tokens):
+        """Documents containing tokens as consecutive words of one field"""
+        postings = [self.postings.get(token) for token in tokens]
+        if not all(postings):
+            return set()
+        documents = set.intersection(*(set(p) for p in postings))
+        matches = set()
+        for document in documents:
+            starts = set(postings[0][document])
+            for offset, token_postings in enumerate(postings[1:], 1):
+                starts &= {position - offset for position in token_postings[document]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(document)
+        return matches
+
+    def search(self, query, k=10):
+        """The k best (slug, score) matches for query; "quoted phrases" must match exactly"""
+        phrases = [words(phrase) for phrase in _PHRASE.findall(query)]
+        tokens = tokenize(_PHRASE.sub(' ', query)) + [
+            word for phrase in phrases for word in phrase if word not in STOP_WORDS]
+        if not tokens or not self.lengths:
+            return []
+
+        average_length = sum(self.lengths) / len(self.lengths)
+        scores = defaultdict(float)
+        for token in set(tokens):
+            idf = self._idf(token)
+            for document, positions in self.postings.get(token, {}).items():
+                frequency = len(positions)
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[document] / average_length)
+                scores[document] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        for phrase in phrases:
+            if len(phrase) > 1:
+                allowed = self._phrase_documents(phrase)
+                scores = {document: score for document, score in scores.items()
+                          if document in allowed}
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], self.slugs[item[0]]))[:k]
+        return [(self.slugs[document], score) for document, score in best]
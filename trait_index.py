@@ -0,0 +1,174 @@
+import numpy as np
+
+from breed_fields import BREED_COLUMNS, TRAIT_COLUMNS
+
+
+# Words accepted in place of a 1-5 target score in preference queries
+LEVELS = {'low': 1, 'medium': 3, 'high': 5}
+
+_TRAIT_OFFSET = BREED_COLUMNS.index(TRAIT_COLUMNS[0])
+
+# Upper bound on the breeds x queries distance matrix built at once, in cells
+_MAX_CELLS = 1 << 24
+
+
+def _level(value):
+    if isinstance(value, str):
+        return LEVELS[value.lower()]
+    return value
+
+
+class TraitIndex:
+    """The 14 trait scores of every breed in one NumPy matrix, for similarity queries.
+
+    Distances are weighted root-mean-square differences in score, taken over
+    the traits both sides have: a missing score (NaN) neither matches nor
+    mismatches anything. Breeds sharing no scored trait with a query are
+    infinitely far away. All queries are answered for a whole batch at once
+    with a few matrix products.
+    """
+
+    def __init__(self, slugs, scores):
+        self.slugs = list(slugs)
+        self.positions = {slug: i for i, slug in enumerate(self.slugs)}
+
+        scores = np.asarray(scores, dtype=np.float32)
+        if scores.shape != (len(self.slugs), len(TRAIT_COLUMNS)):
+            raise ValueError(f"Expected a {len(self.slugs)}x{len(TRAIT_COLUMNS)} score matrix")
+        self.scores = scores
+        # Missing scores as 0 with a 0/1 mask, so they drop out of every sum.
+        # Stacked trait-major so a batch of queries is a single matrix product.
+        known = (~np.isnan(scores)).astype(np.float32)
+        filled = np.nan_to_num(scores)
+        self.features = np.ascontiguousarray(np.hstack([filled ** 2, filled, known]).T)
+
+    def __len__(self):
+        return len(self.slugs)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds the index from dog_breeds rows ordered like BREED_COLUMNS"""
+        rows = list(rows)
+        scores = np.array(
+            [row[_TRAIT_OFFSET:_TRAIT_OFFSET + len(TRAIT_COLUMNS)] for row in rows],
+            dtype=np.float32).reshape(-1, len(TRAIT_COLUMNS))
+        return cls([row[0] for row in rows], scores)
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds the index from BreedRecords"""
+        records = list(records)
+        scores = np.array([record.scores for record in records],
+                          dtype=np.float32).reshape(-1, len(TRAIT_COLUMNS))
+        scores[scores == 0] = np.nan
+        return cls([record.slug for record in records], scores)
+
+    @classmethod
+    def from_table(cls, table):
+        """Builds the index from an exported Arrow table (see breed_export)"""
+        scores = np.column_stack([
+            table.column(column).to_numpy(zero_copy_only=False).astype(np.float32)
+            for column in TRAIT_COLUMNS])
+        return cls(table.column('slug').to_pylist(), scores)
+
+    def distances(self, targets, weights=None):
+        """(queries x breeds) matrix of distances from each target vector.
+
+        targets is a (queries x 14) array with NaN for traits the query
+        doesn't care about; weights, of the same shape, defaults to 1.
+        """
+        targets = np.atleast_2d(np.asarray(targets, dtype=np.float32))
+        if weights is None:
+            weights = np.ones_like(targets)
+        weights = np.where(np.isnan(targets), 0, np.atleast_2d(weights)).astype(np.float32)
+        targets = np.nan_to_num(targets)
+
+        # sum w*(x-t)^2 over known traits is w.x^2 - 2wt.x + wt^2.known,
+        # and the weight that applied is w.known
+        weighted_targets = weights * targets
+        zeros = np.zeros_like(weights)
+        products = np.vstack([
+            np.hstack([weights, -2 * weighted_targets, weighted_targets * targets]),
+            np.hstack([zeros, zeros, weights]),
+        ]) @ self.features
+        squared, total_weight = products[:len(targets)], products[len(targets):]
+
+        np.maximum(squared, 0, out=squared)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            squared /= total_weight
+        squared[total_weight == 0] = np.inf
+        return np.sqrt(squared, out=squared)
+
+    def search(self, targets, weights=None, k=10, exclude=None):
+        """The k nearest (slug, distance) pairs for each target vector.
+
+        Queries are answered in chunks that keep the distance matrix small;
+        exclude optionally gives, per query, a row to leave out (the breed
+        itself in similar()).
+        """
+        targets = np.atleast_2d(np.asarray(targets, dtype=np.float32))
+        if weights is not None:
+            weights = np.atleast_2d(np.asarray(weights, dtype=np.float32))
+        chunk = max(1, _MAX_CELLS // max(len(self.slugs), 1))
+
+        results = []
+        for start in range(0, len(targets), chunk):
+            end = start + chunk
+            distances = self.distances(
+                targets[start:end], None if weights is None else weights[start:end])
+            results.extend(self._top_k(
+                distances, k, None if exclude is None else exclude[start:end]))
+        return results
+
+    def _top_k(self, distances, k, exclude=None):
+        """Per query row, the k nearest (slug, distance) pairs"""
+        if exclude is not None:
+            distances[np.arange(len(exclude)), exclude] = np.inf
+        k = min(k, len(self.slugs))
+        if k == 0:
+            return [[] for _ in distances]
+        if k < len(self.slugs):
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(k), (len(distances), k))
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        order = np.argsort(nearest_distances, axis=1, kind='stable')
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        nearest_distances = np.take_along_axis(nearest_distances, order, axis=1)
+
+        return [[(self.slugs[row], float(distance))
+                 for row, distance in zip(rows, row_distances) if distance != np.inf]
+                for rows, row_distances in zip(nearest.tolist(), nearest_distances.tolist())]
+
+    def preference_vector(self, preferences):
+        """Target vector for {trait: score or level word}, NaN for the other traits"""
+        vector = np.full(len(TRAIT_COLUMNS), np.nan, dtype=np.float32)
+        for column, value in preferences.items():
+            vector[TRAIT_COLUMNS.index(column)] = _level(value)
+        return vector
+
+    def weight_vector(self, weights):
+        vector = np.ones(len(TRAIT_COLUMNS), dtype=np.float32)
+        for column, weight in (weights or {}).items():
+            vector[TRAIT_COLUMNS.index(column)] = weight
+        return vector
+
+    def similar(self, slug, k=10):
+        """The k breeds whose traits are closest to slug's"""
+        return self.similar_batch([slug], k)[0]
+
+    def similar_batch(self, slugs, k=10):
+        """similar() for many breeds in one pass"""
+        positions = np.array([self.positions[slug] for slug in slugs], dtype=np.intp)
+        return self.search(self.scores[positions], k=k, exclude=positions)
+
+    def query(self, preferences, weights=None, k=10):
+        """Breeds best matching e.g. {'shedding_level': 'low', 'trainability_level': 5}"""
+        return self.query_batch([preferences], [weights], k)[0]
+
+    def query_batch(self, preferences, weights=None, k=10):
+        """query() for a list of preference dicts (and optional weight dicts)"""
+        targets = np.array([self.preference_vector(p) for p in preferences])
+        weights = np.array([self.weight_vector(w)
+                            for w in (weights or [None] * len(preferences))])
+        return self.search(targets, weights, k)
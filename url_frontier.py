@@ -0,0 +1,98 @@
+import json
+import os
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url):
+    """Canonical form of a breed URL used for deduplication.
+
+    Scheme and host are lowercased, query and fragment dropped and the path
+    always ends in a slash, so http://www.AKC.org/dog-breeds/akita and
+    https://www.akc.org/dog-breeds/akita/?x=1 are the same breed.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path if parts.path.endswith('/') else parts.path + '/'
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme,
+                       parts.netloc.lower(), path, '', ''))
+
+
+def url_slug(url):
+    """Breed slug from a breed URL (the last path segment)"""
+    return urlsplit(url).path.rstrip('/').split('/')[-1]
+
+
+class UrlFrontier:
+    """Ordered set of breed URLs with where each one was found.
+
+    Lookups and inserts are O(1) by normalized URL, iteration follows
+    insertion order, and each entry remembers the listing letter and page
+    it came from. Saved next to the link files so later runs can resume
+    or diff against it.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return normalize_url(url) in self.entries
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def add(self, url, name=None, letter=None, page=None):
+        """Adds a URL, returns False if it was already known"""
+        key = normalize_url(url)
+        if key in self.entries:
+            return False
+        self.entries[key] = {
+            'name': name,
+            'url': url,
+            'slug': url_slug(url),
+            'letter': letter,
+            'page': page
+        }
+        return True
+
+    def links(self):
+        """Entries in the {'name', 'url'} shape of the output/ link files"""
+        return [{'name': entry['name'], 'url': entry['url']} for entry in self]
+
+    def slugs(self):
+        return [entry['slug'] for entry in self]
+
+    def diff(self, previous):
+        """Returns (added, removed) entries compared to an older frontier"""
+        added = [entry for key, entry in self.entries.items() if key not in previous.entries]
+        removed = [entry for key, entry in previous.entries.items() if key not in self.entries]
+        return added, removed
+
+    @classmethod
+    def from_links(cls, links):
+        """Builds a frontier from a list of {'name', 'url'} dicts, dropping duplicates"""
+        frontier = cls()
+        for link in links:
+            frontier.add(link['url'], link.get('name'), link.get('letter'), link.get('page'))
+        return frontier
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(list(self.entries.values()), f, indent=4, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_links(json.load(f))
+
+    @classmethod
+    def latest(cls, output_dir='output'):
+        """Loads the most recent saved frontier in output_dir, or None"""
+        if not os.path.isdir(output_dir):
+            return None
+        paths = [os.path.join(output_dir, f) for f in os.listdir(output_dir)
+                 if f.startswith('frontier_') and f.endswith('.json')]
+        if not paths:
+            return None
+        return cls.load(max(paths, key=os.path.getctime))